@@ -0,0 +1,93 @@
+# almacen_planes.py
+# Almacén en disco de planes de eliminación (pseudo-inversa, filas nulas, pivotes y núcleo) por n,
+# en archivos binarios de formato fijo. Se activa sólo si está definida LIGHTS_OUT_ALMACEN.
+# Cargar un plan lee el archivo entero: se verifica el checksum y se arman todas las filas, que
+# el solver usa en cada tablero (no hay lectura perezosa por páginas).
+#
+# Formato (little-endian), archivo plan_n{n}.lop:
+#   cabecera (40 bytes): magia b"LOPLAN\0\0", versión, tam, #pinv, #nulos, #núcleo, bytes por fila,
+#                        crc32 del contenido, 4 bytes reservados
+#   contenido:           columnas pivote (uint32 × #pinv, rellenado a múltiplo de 8 bytes),
+#                        filas de pinv, filas nulas y vectores del núcleo (bytes por fila cada una)
+import os
+import struct
+import tempfile
+import zlib
+from typing import List, Optional, Tuple
+
+MAGIA = b"LOPLAN\0\0"
+VERSION = 1
+_CABECERA = struct.Struct("<8s7I4x")
+
+def directorio_almacen() -> Optional[str]:
+    """
+    Directorio del almacén: el de $LIGHTS_OUT_ALMACEN (p. ej. ~/.cache/lights_out). Sin la
+    variable, vacía o "0", el almacén está desactivado y los planes sólo viven en memoria.
+    """
+    valor = os.environ.get("LIGHTS_OUT_ALMACEN")
+    if not valor or valor == "0":
+        return None
+    return os.path.expanduser(valor)
+
+def ruta_plan(directorio: str, n: int) -> str:
+    return os.path.join(directorio, f"plan_n{n}.lop")
+
+def _bytes_por_fila(tam: int) -> int:
+    return ((tam + 63) // 64) * 8
+
+def guardar_plan(ruta: str, tam: int, pivotes: List[int], pinv: List[int], nulos: List[int], nucleo: List[int]):
+    """
+    Escribe el plan de forma atómica: primero a un temporal en el mismo directorio y después
+    os.replace, así ningún lector ve un archivo a medio escribir aunque varios procesos lo armen a la vez.
+    """
+    bf = _bytes_por_fila(tam)
+    partes = [struct.pack(f"<{len(pivotes)}I", *pivotes)]
+    relleno = (-len(partes[0])) % 8
+    partes.append(b"\0" * relleno)
+    for fila in (*pinv, *nulos, *nucleo):
+        partes.append(fila.to_bytes(bf, "little"))
+    contenido = b"".join(partes)
+    cabecera = _CABECERA.pack(MAGIA, VERSION, tam, len(pinv), len(nulos), len(nucleo), bf, zlib.crc32(contenido))
+
+    directorio = os.path.dirname(ruta)
+    os.makedirs(directorio, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(prefix=".plan_", dir=directorio)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(cabecera)
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+def cargar_plan(ruta: str, tam: int) -> Optional[Tuple[List[int], List[int], List[int], List[int]]]:
+    """
+    Lee (pivotes, pinv, nulos, nucleo) del archivo entero. Devuelve None si no existe, es de otra
+    versión o tamaño, o no pasa el checksum (el llamador lo vuelve a armar).
+    """
+    try:
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        if len(datos) < _CABECERA.size:
+            return None
+        magia, version, tam_arch, n_pinv, n_nulos, n_nucleo, bf, crc = _CABECERA.unpack_from(datos, 0)
+        if magia != MAGIA or version != VERSION or tam_arch != tam or bf != _bytes_por_fila(tam):
+            return None
+        contenido = memoryview(datos)[_CABECERA.size:]
+        if zlib.crc32(contenido) != crc:
+            return None
+        pivotes = list(struct.unpack_from(f"<{n_pinv}I", contenido, 0))
+        inicio = 4 * n_pinv + (-4 * n_pinv) % 8
+        if inicio + bf * (n_pinv + n_nulos + n_nucleo) != len(contenido):
+            return None
+        filas = [int.from_bytes(contenido[inicio + i * bf:inicio + (i + 1) * bf], "little")
+                 for i in range(n_pinv + n_nulos + n_nucleo)]
+    except (OSError, ValueError, struct.error):
+        return None
+    return pivotes, filas[:n_pinv], filas[n_pinv:n_pinv + n_nulos], filas[n_pinv + n_nulos:]
@@ -0,0 +1,210 @@
+# bench_lights_out.py
+# Benchmarks de construcción de A, solver, simulación y rango para distintos n.
+# Uso:
+#   python bench_lights_out.py --n-max 30 --json bench.json
+#   python bench_lights_out.py --json nuevo.json --base bench.json --umbral 0.2
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import lote_numpy
+from experimentos_stats import aplicar, rango_F2
+from resuelve_lights_out import (
+    _simular_aplicacion, construir_A_bitfilas, limpiar_cache_planes, plan_eliminacion, resuelve_lights_out,
+)
+
+SEED = 12345
+LOTE = 1000  # tableros por llamada en los casos de lote
+
+def _tablero_resoluble(n: int, rng: random.Random):
+    """Tablero con solución garantizada: se obtiene presionando celdas al azar sobre el tablero apagado."""
+    x = [rng.randint(0, 1) for _ in range(n * n)]
+    return _simular_aplicacion([[0] * n for _ in range(n)], x), x
+
+# Cada caso: nombre -> (preparar(n, rng) -> función sin argumentos, tableros por llamada; 0 si no aplica)
+def _caso_construir(n, rng):
+    return lambda: construir_A_bitfilas(n)
+
+def _caso_plan(n, rng):
+    def correr():
+        limpiar_cache_planes()
+        plan_eliminacion(n)
+    return correr
+
+def _caso_plan_almacen(n, rng):
+    """Cargar el plan de n desde el almacén en disco (armado y guardado antes de medir)."""
+    directorio = tempfile.mkdtemp(prefix="bench_almacen_")
+    atexit.register(shutil.rmtree, directorio, ignore_errors=True)
+    def correr():
+        os.environ["LIGHTS_OUT_ALMACEN"] = directorio
+        try:
+            limpiar_cache_planes()
+            plan_eliminacion(n)
+        finally:
+            del os.environ["LIGHTS_OUT_ALMACEN"]
+    correr()
+    return correr
+
+def _caso_resolver(metodo):
+    def preparar(n, rng):
+        tab, _ = _tablero_resoluble(n, rng)
+        resuelve_lights_out(tab, metodo=metodo)  # calienta las cachés
+        return lambda: resuelve_lights_out(tab, metodo=metodo)
+    return preparar
+
+def _caso_simular(n, rng):
+    tab, x = _tablero_resoluble(n, rng)
+    return lambda: _simular_aplicacion(tab, x)
+
+def _caso_aplicar(n, rng):
+    tab, x = _tablero_resoluble(n, rng)
+    return lambda: aplicar(tab, x)
+
+def _caso_rango(n, rng):
+    A = construir_A_bitfilas(n)
+    return lambda: rango_F2(A)
+
+def _caso_verificar_lote_python(n, rng):
+    pares = [_tablero_resoluble(n, rng) for _ in range(LOTE)]
+    return lambda: all(not any(v for fila in aplicar(tab, x) for v in fila) for tab, x in pares)
+
+def _caso_verificar_lote_numpy(n, rng):
+    gen = lote_numpy.np.random.default_rng(rng.getrandbits(64))
+    planes = lote_numpy.tableros_aleatorios(LOTE, n, gen)
+    tableros = lote_numpy.cruz(planes)
+    return lambda: bool(lote_numpy.verificar_lote(tableros, planes).all())
+
+CASOS: Dict[str, tuple] = {
+    "construir_A_bitfilas": (_caso_construir, 0),
+    "plan_eliminacion": (_caso_plan, 0),
+    "plan_eliminacion[almacen]": (_caso_plan_almacen, 0),
+    "resuelve_lights_out": (_caso_resolver("gauss"), 1),
+    "resuelve_lights_out[chase]": (_caso_resolver("chase"), 1),
+    "_simular_aplicacion": (_caso_simular, 1),
+    "aplicar": (_caso_aplicar, 1),
+    "rango_F2": (_caso_rango, 0),
+    "verificar_lote[python]": (_caso_verificar_lote_python, LOTE),
+}
+if lote_numpy.disponible():
+    CASOS["verificar_lote[numpy]"] = (_caso_verificar_lote_numpy, LOTE)
+
+
+def _percentil(xs: List[float], p: float) -> float:
+    ordenados = sorted(xs)
+    idx = min(len(ordenados) - 1, max(0, int(round(p * (len(ordenados) - 1)))))
+    return ordenados[idx]
+
+def _medir(fn: Callable[[], object], repeticiones: int, limite_s: float) -> List[float]:
+    """Tiempos de repeticiones llamadas (corta antes si se pasa del límite de tiempo total)."""
+    tiempos = []
+    fin = time.perf_counter() + limite_s
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - t0)
+        if time.perf_counter() > fin:
+            break
+    return tiempos
+
+def _pico_memoria(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def correr(casos: List[str], n_min: int, n_max: int, repeticiones: int, limite_s: float) -> List[dict]:
+    """
+    Mide cada caso para n = n_min..n_max. Un caso deja de crecer en n cuando una sola llamada
+    supera limite_s (lo "factible" depende de la máquina).
+    """
+    resultados = []
+    for nombre in casos:
+        preparar, tableros = CASOS[nombre]
+        for n in range(n_min, n_max + 1):
+            rng = random.Random(SEED + n)
+            fn = preparar(n, rng)
+            tiempos = _medir(fn, repeticiones, limite_s)
+            mediana = statistics.median(tiempos)
+            fila = {
+                "funcion": nombre,
+                "n": n,
+                "repeticiones": len(tiempos),
+                "mediana_s": mediana,
+                "p95_s": _percentil(tiempos, 0.95),
+                "pico_bytes": _pico_memoria(fn),
+            }
+            if tableros:
+                fila["tableros_por_s"] = tableros / mediana if mediana > 0 else float("inf")
+            resultados.append(fila)
+            print(f"{nombre:>28s} n={n:>3d}  mediana={mediana*1e3:10.3f} ms  p95={fila['p95_s']*1e3:10.3f} ms"
+                  f"  pico={fila['pico_bytes']/1024:10.1f} KiB", file=sys.stderr)
+            if min(tiempos) > limite_s:
+                break
+    return resultados
+
+def comparar(resultados: List[dict], base: dict, umbral: float) -> List[str]:
+    """Regresiones: casos cuya mediana empeoró más que umbral (fracción) respecto de la base."""
+    previos = {(r["funcion"], r["n"]): r for r in base.get("resultados", [])}
+    regresiones = []
+    for r in resultados:
+        previo = previos.get((r["funcion"], r["n"]))
+        if previo is None or previo["mediana_s"] <= 0:
+            continue
+        razon = r["mediana_s"] / previo["mediana_s"]
+        if razon > 1 + umbral:
+            regresiones.append(f"{r['funcion']} n={r['n']}: {previo['mediana_s']*1e3:.3f} ms -> "
+                               f"{r['mediana_s']*1e3:.3f} ms (x{razon:.2f})")
+    return regresiones
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del solver de Lights Out.")
+    parser.add_argument("--casos", nargs="+", choices=sorted(CASOS), default=list(CASOS),
+                        help="casos a medir (por defecto, todos)")
+    parser.add_argument("--n-min", type=int, default=2)
+    parser.add_argument("--n-max", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--limite-s", type=float, default=2.0,
+                        help="tiempo máximo por caso y n; si una llamada lo supera, no se prueban n mayores")
+    parser.add_argument("--json", help="archivo donde guardar los resultados (JSON)")
+    parser.add_argument("--base", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--umbral", type=float, default=0.2, help="empeoramiento tolerado (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    # Los casos miden la eliminación, no una lectura de disco: el almacén sólo se usa en su propio caso.
+    os.environ.pop("LIGHTS_OUT_ALMACEN", None)
+
+    resultados = correr(args.casos, args.n_min, args.n_max, args.repeticiones, args.limite_s)
+    salida = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": resultados,
+    }
+    texto = json.dumps(salida, indent=2, ensure_ascii=False)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            regresiones = comparar(resultados, json.load(f), args.umbral)
+        for r in regresiones:
+            print("REGRESIÓN:", r, file=sys.stderr)
+        return 1 if regresiones else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# carga_servidor.py
+# Prueba de carga de servidor_lights_out: varios hilos pidiendo tableros al mismo tiempo.
+# Uso:
+#   python carga_servidor.py --iniciar --n 10 --hilos 16 --pedidos 200
+#   python carga_servidor.py --url http://127.0.0.1:8765 --n 20 --hilos 8 --lote 32
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from servidor_lights_out import (
+    URL, ServidorLightsOut, _percentil, metricas_remotas, resuelve_lights_out_remoto, resuelve_lote_remoto,
+)
+from tablero import Tablero
+
+SEED = 12345
+
+def _tableros_resolubles(n: int, cantidad: int, rng: random.Random) -> List[Tablero]:
+    """Tableros con solución: el resultado de presionar celdas al azar sobre el tablero apagado."""
+    return [Tablero(n).aplicar(Tablero(n, rng.getrandbits(n * n))) for _ in range(cantidad)]
+
+def cargar(url: str, n: int, hilos: int, pedidos: int, lote: int) -> dict:
+    """Cada hilo hace `pedidos` pedidos de `lote` tableros; verifica cada solución recibida."""
+    latencias: List[float] = []
+    fallas = []
+    cerrojo = threading.Lock()
+
+    def trabajar(h: int):
+        rng = random.Random(f"{SEED}:{n}:{h}")
+        propias = []
+        for _ in range(pedidos):
+            tabs = _tableros_resolubles(n, lote, rng)
+            t0 = time.perf_counter()
+            try:
+                if lote == 1:
+                    xs = [resuelve_lights_out_remoto(tabs[0], url=url)]
+                else:
+                    xs = resuelve_lote_remoto(tabs, url=url)
+            except Exception as e:
+                with cerrojo:
+                    fallas.append(repr(e))
+                continue
+            propias.append(time.perf_counter() - t0)
+            if any(x is None or not t.aplicar(x).apagado() for t, x in zip(tabs, xs)):
+                with cerrojo:
+                    fallas.append("solución incorrecta")
+        with cerrojo:
+            latencias.extend(propias)
+
+    t0 = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajar, args=(h,)) for h in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    total_s = time.perf_counter() - t0
+    return {
+        "n": n,
+        "hilos": hilos,
+        "pedidos": len(latencias),
+        "tableros_por_pedido": lote,
+        "fallas": len(fallas),
+        "total_s": total_s,
+        "pedidos_por_s": len(latencias) / total_s,
+        "tableros_por_s": len(latencias) * lote / total_s,
+        "latencia_ms": {p: _percentil(latencias, q) * 1e3 for p, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "ejemplos_fallas": fallas[:3],
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor de Lights Out.")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--iniciar", action="store_true",
+                        help="levantar un servidor propio en un puerto libre (ignora --url)")
+    parser.add_argument("--n", type=int, default=10)
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--pedidos", type=int, default=100, help="pedidos por hilo")
+    parser.add_argument("--lote", type=int, default=1, help="tableros por pedido")
+    args = parser.parse_args(argv)
+
+    servidor = None
+    url = args.url
+    if args.iniciar:
+        servidor = ServidorLightsOut(puerto=0)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = servidor.url
+    try:
+        resuelve_lote_remoto(_tableros_resolubles(args.n, 1, random.Random(SEED)), url=url)  # calienta el plan
+        resultado = cargar(url, args.n, args.hilos, args.pedidos, args.lote)
+        resultado["servidor"] = metricas_remotas(url)
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    return 1 if resultado["fallas"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
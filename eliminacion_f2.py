@@ -0,0 +1,107 @@
+# eliminacion_f2.py
+# Eliminación de Gauss-Jordan en 𝔽₂ por bloques de columnas (estilo "Método de los Cuatro Rusos", M4RI),
+# con filas como bitsets y usando SOLO sumas de filas (Fi <- Fi + Fj): las filas no se intercambian.
+from typing import Callable, List, Optional, Tuple
+
+K_BLOQUE = 8
+
+class Cancelado(Exception):
+    """Trabajo interrumpido a pedido: la función cancelado() que se pasó devolvió True."""
+
+def eliminar_por_bloques(filas: List[int], ncols: int, k: int = K_BLOQUE) -> Tuple[List[Tuple[int, int]], int, int]:
+    """
+    Lleva filas (en el lugar) a forma escalonada reducida sobre las columnas 0..ncols-1. Los bits
+    desde ncols en adelante no se miran pero viajan con cada suma (sirven para aumentar la matriz,
+    p. ej. con la identidad, y registrar las operaciones hechas).
+    Por cada bloque de k columnas:
+      1. se buscan hasta k pivotes entre las filas que todavía no lo son, reduciendo cada candidata
+         sólo contra los pivotes del bloque (a lo sumo k sumas por candidata);
+      2. se arma la tabla de las 2^k combinaciones de esos pivotes (una suma por entrada);
+      3. cada una de las demás filas limpia las k columnas con UNA suma: tabla[sus k bits].
+    Así cada columna cuesta ~2^k/k + filas/k sumas en vez de ~filas.
+    Devuelve (pivotes, xors, sondeos): pivotes = [(fila, columna)] ordenados por columna; las filas
+    que no son pivote quedan nulas en las columnas 0..ncols-1.
+    """
+    libres = list(range(len(filas)))
+    pivotes: List[Tuple[int, int]] = []
+    xors = sondeos = 0
+    for c0 in range(0, ncols, k):
+        ancho = min(k, ncols - c0)
+        ventana = (1 << ancho) - 1
+
+        # 1. pivotes del bloque, reducidos entre sí
+        bloque: List[Tuple[int, int]] = []
+        quedan: List[int] = []
+        i = 0
+        while i < len(libres) and len(bloque) < ancho:
+            r = libres[i]
+            i += 1
+            sondeos += 1
+            fila = filas[r]
+            for pr, pc in bloque:
+                if (fila >> pc) & 1:
+                    fila ^= filas[pr]
+                    xors += 1
+            w = (fila >> c0) & ventana
+            if w:
+                pc = c0 + (w & -w).bit_length() - 1
+                for pr, _ in bloque:
+                    if (filas[pr] >> pc) & 1:
+                        filas[pr] ^= fila
+                        xors += 1
+                bloque.append((r, pc))
+            else:
+                quedan.append(r)
+            filas[r] = fila
+        quedan.extend(libres[i:])
+        libres = quedan
+        if not bloque:
+            continue
+
+        # 2. tabla de combinaciones: tabla[w] = suma de los pivotes cuyas columnas están en w
+        por_col = [0] * ancho
+        for pr, pc in bloque:
+            por_col[pc - c0] = filas[pr]
+        tabla = [0] * (1 << ancho)
+        for w in range(1, 1 << ancho):
+            bajo = w & -w
+            tabla[w] = tabla[w ^ bajo] ^ por_col[bajo.bit_length() - 1]
+        xors += (1 << ancho) - 1
+
+        # 3. limpiar el bloque en el resto de las filas (las pivote anteriores y las libres)
+        en_bloque = {pr for pr, _ in bloque}
+        mascara_piv = 0
+        for _, pc in bloque:
+            mascara_piv |= 1 << (pc - c0)
+        for r in range(len(filas)):
+            if r in en_bloque:
+                continue
+            w = (filas[r] >> c0) & mascara_piv
+            if w:
+                filas[r] ^= tabla[w]
+                xors += 1
+        pivotes.extend(bloque)
+
+    pivotes.sort(key=lambda rc: rc[1])
+    return pivotes, xors, sondeos
+
+def trasponer(filas: List[int], ncols: int, franja: int = 1024,
+              cancelado: Optional[Callable[[], bool]] = None) -> List[int]:
+    """
+    Traspuesta de una matriz de bits: columnas[c] tiene el bit r si filas[r] tiene el bit c.
+    Cada fila se escribe como cadena de bits y las columnas salen de zip sobre franjas de
+    `franja` columnas, así el trabajo por bit se hace en C (ir bit por bit en Python es ~40 veces
+    más lento) y la memoria extra queda acotada por la franja.
+    Si se pasa cancelado, se consulta antes de cada franja y se lanza Cancelado si devuelve True.
+    """
+    if not filas:
+        return [0] * ncols
+    # Filas de la última a la primera: en cada columna, el carácter de la fila 0 queda al final (bit 0).
+    cadenas = [format(f, f"0{ncols}b")[::-1] for f in reversed(filas)]
+    columnas: List[int] = []
+    for c0 in range(0, ncols, franja):
+        if cancelado is not None and cancelado():
+            raise Cancelado()
+        trozos = [s[c0:c0 + franja] for s in cadenas]
+        columnas.extend(int("".join(col), 2) for col in zip(*trozos))
+    return columnas
@@ -1,102 +1,278 @@
+import argparse
+import math
 import random
-from typing import List
-from resuelve_lights_out import resuelve_lights_out  # tu solver
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+import lote_numpy
+from tablero import Tablero
+from topologias import grilla_cuadrada
+from eliminacion_f2 import eliminar_por_bloques
+from polinomios_f2 import nulidad_lights_out
+from resuelve_lights_out import (  # tu solver
+    PerfilSolver, construir_A_bitfilas, es_resoluble, plan_eliminacion, resuelve_lote,
+)
+from resuelve_lights_out_zk import aplicar_zk, plan_zk, rango_y_nulidad_zk, resuelve_lote_zk
 
 M = 10000
 SEED = 12345
 
-def vecinos_cruz(i, j, n):
-    for di, dj in ((0,0),(1,0),(-1,0),(0,1),(0,-1)):
-        r, c = i+di, j+dj
-        if 0 <= r < n and 0 <= c < n:
-            yield r, c
-
-def a_idx(i, j, n): 
-    return i*n + j
-
-def construir_A_bitfilas(n: int) -> List[int]:
-    """Devuelve A como lista de filas en bitset (int) de tamaño n^2."""
-    tam = n*n
-    A = [0]*tam
-    for i in range(n):
-        for j in range(n):
-            fila = a_idx(i, j, n)
-            bits = 0
-            for r in range(n):
-                for c in range(n):
-                    if (i, j) in vecinos_cruz(r, c, n):
-                        bits |= (1 << a_idx(r, c, n))
-            A[fila] = bits
-    return A
-
 def rango_F2(filas_bits: List[int]) -> int:
-    """Rango por Gauss binario con filas como bitsets."""
+    """Rango por Gauss binario con filas como bitsets (eliminación por bloques, ver eliminacion_f2)."""
     A = filas_bits[:]
-    rank = 0
     m = max((x.bit_length() for x in A), default=0)
-    for col in range(m-1, -1, -1):
-        piv = -1
-        for r in range(rank, len(A)):
-            if (A[r] >> col) & 1:
-                piv = r
-                break
-        if piv == -1:
-            continue
-        if piv != rank:
-            A[rank], A[piv] = A[piv], A[rank]
-        for r in range(len(A)):
-            if r != rank and ((A[r] >> col) & 1):
-                A[r] ^= A[rank]
-        rank += 1
-        if rank == len(A):
-            break
-    return rank
-
-def nulidad_y_rango(n: int):
+    pivotes, _, _ = eliminar_por_bloques(A, m)
+    return len(pivotes)
+
+def nulidad_y_rango(n: int, metodo: str = "polinomios"):
+    """
+    (rango, nulidad) de A para tamaño n.
+      "polinomios": nulidad = grado(mcd(p_n(x), p_n(x+1))) (ver polinomios_f2), sirve hasta n = 2000+
+      "denso":      Gauss sobre las n² filas de A, O(n⁶)
+    """
+    if metodo == "polinomios":
+        nullity = nulidad_lights_out(n)
+        return n*n - nullity, nullity
+    if metodo != "denso":
+        raise ValueError(f"Método desconocido: {metodo!r} (use 'polinomios' o 'denso').")
     A = construir_A_bitfilas(n)
     rank = rango_F2(A)
     nullity = n*n - rank
     return rank, nullity
 
-def tablero_random(n: int):
-    return [[random.randint(0,1) for _ in range(n)] for _ in range(n)]
+def verificar_nulidades(n_max: int = 20) -> None:
+    """Contrasta la nulidad por polinomios con la de Gauss denso para n = 1..n_max (AssertionError si difieren)."""
+    for n in range(1, n_max + 1):
+        rapido, denso = nulidad_y_rango(n), nulidad_y_rango(n, "denso")
+        assert rapido == denso, f"n={n}: polinomios {rapido} != denso {denso}"
+
+def tablero_random(n: int, k: int = 2, rng=random):
+    return [[rng.randint(0,k-1) for _ in range(n)] for _ in range(n)]
+
+def tablero_random_bits(n: int, rng=random) -> Tablero:
+    """Como tablero_random(n) (consume el generador igual), pero como bitboard."""
+    bits = 0
+    for k in range(n*n):
+        if rng.randint(0,1):
+            bits |= 1 << k
+    return Tablero(n, bits)
 
 def aplicar(tab, plan):
     """Aplica plan (vector 0/1) al tablero y devuelve el final."""
     n = len(tab)
+    topo = grilla_cuadrada(n)
     out = [fila[:] for fila in tab]
     for k, bit in enumerate(plan):
         if bit:
             i, j = divmod(k, n)
-            for di, dj in ((0,0),(1,0),(-1,0),(0,1),(0,-1)):
-                r, c = i+di, j+dj
-                if 0 <= r < n and 0 <= c < n:
-                    out[r][c] ^= 1
+            topo.presionar_matriz(out, i, j)
     return out
 
+def muestrear(n: int, m: int, k: int = 2, perfil: Optional[PerfilSolver] = None, rng=random) -> Tuple[int, int]:
+    """
+    Sortea m tableros n×n sobre ℤ_k con rng, los resuelve y verifica. Devuelve (resueltos, no resueltos).
+    Con perfil (sólo k = 2), acumula ahí los tiempos por fase del solver.
+    """
+    resueltos = 0
+    if k == 2:
+        tableros = [tablero_random_bits(n, rng) for _ in range(m)]
+        resolubles = [b for b in tableros if es_resoluble(b)]
+        no_resueltos = m - len(resolubles)  # b ∉ Col(A), descartados sin resolver
+        for b, x in zip(resolubles, resuelve_lote(resolubles, perfil=perfil)):
+            if x is not None and b.aplicar(x).apagado():
+                resueltos += 1
+            else:
+                no_resueltos += 1  # poco probable si el solver es correcto
+        return resueltos, no_resueltos
+
+    no_resueltos = 0
+    tableros = [tablero_random(n, k, rng) for _ in range(m)]
+    for b, x in zip(tableros, resuelve_lote_zk(tableros, k)):
+        if x is not None and all(v == 0 for fila in aplicar_zk(b, x, k) for v in fila):
+            resueltos += 1
+        else:
+            no_resueltos += 1
+    return resueltos, no_resueltos
+
+def muestrear_numpy(n: int, m: int, perfil: Optional[PerfilSolver] = None, rng=None) -> Tuple[int, int]:
+    """
+    Como muestrear con k = 2, pero con el camino NumPy (ver lote_numpy): los m tableros salen de
+    una sola llamada a rng (np.random.Generator), se resuelven rebanados por bits con el plan de n
+    y se verifican todos con una sola reducción. Otra fuente aleatoria: los conteos no coinciden
+    con los de muestrear, sólo su distribución.
+    """
+    tableros = lote_numpy.tableros_aleatorios(m, n, rng)
+    x_cols, sin_solucion = plan_eliminacion(n, perfil).resolver_rebanadas(lote_numpy.rebanar(tableros), perfil)
+    ok = lote_numpy.verificar_lote(tableros, lote_numpy.desrebanar(x_cols, m, n))
+    resueltos = int((ok & ~lote_numpy.mascara_bits(sin_solucion, m)).sum())
+    return resueltos, m - resueltos
+
+# ---------- valores exactos ----------
+def proporcion_exacta(n: int, k: int = 2) -> Tuple[int, int, float]:
+    """
+    (rango, nulidad, proporción exacta de tableros resolubles). Para k = 2 es 2^(-nulidad), con la
+    nulidad por mcd de polinomios (sirve hasta n = 2000+); para otro k, |Im A|/k^(n²).
+    """
+    if k == 2:
+        rango, nulidad = nulidad_y_rango(n)
+        return rango, nulidad, 2.0 ** -nulidad
+    plan = plan_zk(grilla_cuadrada(n), k)
+    return plan.rango, plan.nulidad, plan.proporcion_resoluble()
+
+def intervalo_wilson(exitos: int, m: int, z: float = 1.959964) -> Tuple[float, float]:
+    """Intervalo de confianza (95% por defecto) de Wilson para una proporción."""
+    if m == 0:
+        return 0.0, 1.0
+    p = exitos / m
+    centro = (p + z*z/(2*m)) / (1 + z*z/m)
+    radio = z * math.sqrt(p*(1-p)/m + z*z/(4*m*m)) / (1 + z*z/m)
+    return max(0.0, centro - radio), min(1.0, centro + radio)
+
+def chi2_bondad(exitos: int, m: int, p: float) -> Tuple[float, float]:
+    """
+    χ² (1 grado de libertad) de resueltos/no resueltos contra la proporción exacta p, y su p-valor.
+    Si p es 0 o 1 no hay variabilidad: el estadístico es 0 si coincide exacto y ∞ si no.
+    """
+    esperados = (m*p, m*(1-p))
+    observados = (exitos, m - exitos)
+    if min(esperados) == 0:
+        coincide = all(o == ex for o, ex in zip(observados, esperados))
+        return (0.0, 1.0) if coincide else (math.inf, 0.0)
+    estadistico = sum((o - ex)**2 / ex for o, ex in zip(observados, esperados))
+    return estadistico, math.erfc(math.sqrt(estadistico / 2))
+
+
+# ---------- corrida en paralelo por fragmentos ----------
+FRAGMENTO = 2000
+
+def semilla_fragmento(semilla: int, k: int, n: int, idx: int) -> str:
+    """Semilla del fragmento idx de tamaño n: depende sólo de (semilla, k, n, idx), no de los workers."""
+    return f"{semilla}:{k}:{n}:{idx}"
+
+def _muestrear_fragmento(n: int, m: int, k: int, semilla: str, con_perfil: bool):
+    perfil = PerfilSolver() if con_perfil else None
+    resueltos, no_resueltos = muestrear(n, m, k, perfil, random.Random(semilla))
+    return n, resueltos, no_resueltos, perfil
+
+def muestrear_en_paralelo(ns: List[int], m: int, k: int, workers: int, fragmento: int = FRAGMENTO,
+                          perfil: Optional[PerfilSolver] = None) -> Iterator[Tuple[int, int, int]]:
+    """
+    Reparte los pares (n, fragmento de muestras) en un ProcessPoolExecutor y va sumando los conteos
+    a medida que terminan. Cada fragmento usa su propia semilla derivada, así el resultado es el mismo
+    con cualquier cantidad de workers. Genera (n, resueltos, no resueltos) en orden de n, apenas
+    termina cada tamaño. El progreso se informa por stderr.
+    """
+    conteos: Dict[int, List[int]] = {n: [0, 0, 0] for n in ns}   # resueltos, no resueltos, fragmentos pendientes
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futuros = []
+        for n in ns:
+            for idx, ini in enumerate(range(0, m, fragmento)):
+                futuros.append(ex.submit(_muestrear_fragmento, n, min(fragmento, m - ini), k,
+                                         semilla_fragmento(SEED, k, n, idx), perfil is not None))
+                conteos[n][2] += 1
+        siguiente = 0
+        for hechos, fut in enumerate(as_completed(futuros), start=1):
+            n, resueltos, no_resueltos, perfil_fragmento = fut.result()
+            conteos[n][0] += resueltos
+            conteos[n][1] += no_resueltos
+            conteos[n][2] -= 1
+            if perfil is not None:
+                perfil.combinar(perfil_fragmento)
+            print(f"\r[{hechos}/{len(futuros)} fragmentos]", end="", file=sys.stderr, flush=True)
+            while siguiente < len(ns) and conteos[ns[siguiente]][2] == 0:
+                r, nr, _ = conteos[ns[siguiente]]
+                yield ns[siguiente], r, nr
+                siguiente += 1
+    print(file=sys.stderr)
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rango, nulidad y proporción de tableros resolubles por tamaño.")
+    parser.add_argument("--k", type=int, default=2, help="estados por luz (Lights Out sobre ℤ_k; 2 = clásico)")
+    parser.add_argument("--profile", action="store_true", help="mostrar al final el perfil acumulado del solver")
+    parser.add_argument("--M", type=int, default=M, help="muestras por tamaño")
+    parser.add_argument("--n-min", type=int, default=2)
+    parser.add_argument("--n-max", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="procesos en paralelo; con N ≥ 1 se usan semillas por fragmento "
+                             "(resultados idénticos para cualquier N). Sin la opción: corrida serial clásica")
+    parser.add_argument("--fragmento", type=int, default=FRAGMENTO, help="muestras por fragmento con --workers")
+    parser.add_argument("--exacto", action="store_true",
+                        help="proporciones exactas (desde la nulidad) en lugar de muestreo Monte Carlo")
+    parser.add_argument("--validar", action="store_true",
+                        help="con --exacto, muestrear igual y contrastar (IC 95%% de Wilson y χ²)")
+    parser.add_argument("--numpy", action="store_true",
+                        help="muestrear con el camino vectorizado de NumPy (k = 2, serial; otra secuencia aleatoria)")
+    parser.add_argument("--verificar-rango", type=int, metavar="N_MAX", default=0,
+                        help="antes de la tabla, contrastar la nulidad por polinomios con Gauss denso hasta N_MAX")
+    args = parser.parse_args()
+    if args.numpy:
+        if not lote_numpy.disponible():
+            parser.error("--numpy requiere NumPy instalado (pip install numpy)")
+        if args.k != 2 or args.workers:
+            parser.error("--numpy sólo admite k = 2 y corrida serial (sin --workers)")
+        rng_np = lote_numpy.np.random.default_rng(SEED)
+    if args.verificar_rango:
+        verificar_nulidades(args.verificar_rango)
+        print(f"Nulidad por polinomios verificada contra Gauss denso para n = 1..{args.verificar_rango}.\n")
+    perfil = PerfilSolver() if args.profile else None
+    ns = list(range(args.n_min, args.n_max + 1))
+
+    if args.exacto:
+        extra = f", k={args.k}" if args.k != 2 else ""
+        print(f"Proporción exacta de tableros resolubles (M={args.M} para los esperados{extra})\n")
+        encabezado = "   n |   rango | nulidad |   proporción exacta | esperados (M·p)"
+        if args.validar:
+            encabezado += " | resueltos |      IC 95% (Wilson) |     χ² | p-valor"
+        print(encabezado)
+        print("-" * len(encabezado))
+        if args.validar:
+            if args.workers:
+                conteos = muestrear_en_paralelo(ns, args.M, args.k, args.workers, args.fragmento, perfil)
+            else:
+                random.seed(SEED)
+                conteos = ((n,) + (muestrear_numpy(n, args.M, perfil, rng_np) if args.numpy
+                                   else muestrear(n, args.M, args.k, perfil)) for n in ns)
+        else:
+            conteos = ((n, None, None) for n in ns)
+        for n, resueltos, _ in conteos:
+            rango, nulidad, p = proporcion_exacta(n, args.k)
+            linea = f"{n:>4d} | {rango:>7d} | {nulidad:>7d} | {p:>19.12g} | {args.M * p:>15.3f}"
+            if args.validar:
+                bajo, alto = intervalo_wilson(resueltos, args.M)
+                chi2, p_valor = chi2_bondad(resueltos, args.M, p)
+                linea += f" | {resueltos:>9d} | [{bajo:.6f}, {alto:.6f}] | {chi2:>6.3f} | {p_valor:>7.4f}"
+            print(linea, flush=True)
+        if perfil is not None:
+            print("\nPerfil acumulado del solver:")
+            print(perfil.resumen())
+        sys.exit(0)
+
     random.seed(SEED)
     col_prop = "Proporción muestral (resueltos/M)"
-    print(f"Muestras uniformes por tamaño: M={M} (semilla={SEED})\n")
+    extra = f", k={args.k}" if args.k != 2 else ""
+    if args.workers:
+        extra += f", fragmentos de {args.fragmento}"
+    if args.numpy:
+        extra += ", NumPy"
+    print(f"Muestras uniformes por tamaño: M={args.M} (semilla={SEED}{extra})\n")
     print(f" n | rango | nulidad | resueltos | no resueltos | {col_prop}")
     print(  "---+-------+---------+-----------+--------------+------------------------------")
 
-    for n in range(2, 11):
-        rango, nulidad = nulidad_y_rango(n)
+    if args.workers:
+        conteos = muestrear_en_paralelo(ns, args.M, args.k, args.workers, args.fragmento, perfil)
+    elif args.numpy:
+        conteos = ((n,) + muestrear_numpy(n, args.M, perfil, rng_np) for n in ns)
+    else:
+        conteos = ((n,) + muestrear(n, args.M, args.k, perfil) for n in ns)
+    for n, resueltos, no_resueltos in conteos:
+        if args.k == 2:
+            rango, nulidad = nulidad_y_rango(n)
+        else:
+            rango, nulidad = rango_y_nulidad_zk(n, args.k)
+
+        prop = resueltos / args.M
+        print(f"{n:>2d} | {rango:>5d} | {nulidad:>7d} | {resueltos:>9d} | {no_resueltos:>12d} | {prop:>28.6f}", flush=True)
 
-        resueltos = 0
-        no_resueltos = 0
-        for _ in range(M):
-            b = tablero_random(n)
-            try:
-                x = resuelve_lights_out(b)
-                fin = aplicar(b, x)
-                if all(v == 0 for fila in fin for v in fila):
-                    resueltos += 1
-                else:
-                    no_resueltos += 1  # poco probable si el solver es correcto
-            except ValueError:
-                no_resueltos += 1     # b ∉ Col(A)
-
-        prop = resueltos / M
-        print(f"{n:>2d} | {rango:>5d} | {nulidad:>7d} | {resueltos:>9d} | {no_resueltos:>12d} | {prop:>28.6f}")
+    if perfil is not None:
+        print("\nPerfil acumulado del solver:")
+        print(perfil.resumen())
@@ -1,7 +1,10 @@
+import queue
 import random
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-from resuelve_lights_out import resuelve_lights_out  # tu función
+from resuelve_lights_out import Cancelado, columnas_persecucion
+from topologias import grilla_cuadrada
 
 ACCENT         = "#C087F5" 
 ACCENT_LIGHT   = "#EAD9FF"
@@ -16,9 +19,10 @@ TEXT           = "#E8EAF0"
 HIGHLIGHT_MS = 400  
 STEP_GAP_MS  = 440   
 POST_HL_MS   = 380   
+SONDEO_MS    = 40
 
-MIN_N, MAX_N = 2, 20
-CELL_MIN, CELL_MAX = 28, 110
+MIN_N, MAX_N = 2, 100
+CELL_MIN, CELL_MAX = 4, 110
 MARGIN = 40
 
 class App(tk.Tk):
@@ -31,9 +35,26 @@ class App(tk.Tk):
 
         self.n = tk.IntVar(value=5)
         self.tablero = [[0]*5 for _ in range(5)]
-        self._ultima_sol = None
+        self._ultima_sol = None   # solución marcada, como bitset (None si no hay)
         self._animando = False
-        self._markers = [] 
+        self._marcas = []         # una marca por celda, oculta salvo que haya que presionarla
+        self._marcadas = 0        # bitset de las marcas visibles
+        self._n_items = None      # n para el que están creados los ítems del canvas
+        self.vivo = tk.BooleanVar(value=False)
+        self._cols_pinv = self._cols_nulos = None   # columnas del plan del n actual (None mientras se prepara)
+        self._x_vivo = 0      # solución (libres = 0) del tablero actual, como bitset
+        self._sindrome = 0    # bits del residuo de la persecución fuera de la base; 0 sii tiene solución
+        # El plan de cada n se arma en un hilo aparte; cada pedido lleva un número de generación
+        # y sólo se usa el resultado del último (los anteriores quedan descartados). La generación
+        # sólo avanza al cambiar n: el plan no depende del tablero.
+        self._generacion = 0
+        self._pedido_n = None     # n del trabajo en curso, si hay uno
+        self._columnas_n = None   # (n, columnas_pinv, columnas_nulos) del último plan recibido
+        self._esperando = False
+        self._sondeando = False
+        self._pedidos = queue.Queue()
+        self._resultados = queue.Queue()
+        threading.Thread(target=self._trabajador, daemon=True).start()
 
         style = ttk.Style()
         try: style.theme_use("clam")
@@ -57,6 +78,9 @@ class App(tk.Tk):
         self.btn_rand  = ttk.Button(top, text="Aleatorio", command=self._aleatorio); self.btn_rand.pack(side=tk.LEFT, padx=6)
         self.btn_calc  = ttk.Button(top, text="Calcular solución", command=self._calcular); self.btn_calc.pack(side=tk.LEFT, padx=10)
         self.btn_apply = ttk.Button(top, text="Aplicar solución", command=self._aplicar); self.btn_apply.pack(side=tk.LEFT, padx=6)
+        self.chk_vivo  = ttk.Checkbutton(top, text="Solución en vivo", variable=self.vivo, command=self._cambiar_vivo); self.chk_vivo.pack(side=tk.LEFT, padx=10)
+        self.lbl_estado = ttk.Label(top, text=""); self.lbl_estado.pack(side=tk.LEFT, padx=6)
+        self.progreso = ttk.Progressbar(top, mode="indeterminate", length=120)
 
         main = ttk.Frame(self); main.pack(fill=tk.BOTH, expand=True, padx=14, pady=8)
         self.canvas = tk.Canvas(main, bg=BOARD, highlightthickness=0)
@@ -64,10 +88,12 @@ class App(tk.Tk):
         self.canvas.bind("<Configure>", lambda _e: self._redibujar())
         self.canvas.bind("<Button-1>", self._click)
 
+        self._reiniciar_vivo()
         self._redibujar()
+        self._mostrar_vivo()
 
     def _metricas(self):
-        n = self.n.get()
+        n = len(self.tablero)
         W = max(self.canvas.winfo_width(), 640)
         H = max(self.canvas.winfo_height(), 480)
         usable_w = W - 2*MARGIN
@@ -78,78 +104,204 @@ class App(tk.Tk):
         ox = (W - grid_w)//2; oy = (H - grid_h)//2
         return n, cell, ox, oy
 
+    @staticmethod
+    def _pad(cell):
+        return max(int(cell*0.12), min(5, cell//6))
+
+    def _caja_luz(self, k, n, cell, ox, oy):
+        i, j = divmod(k, n)
+        pad = self._pad(cell)
+        return ox + j*cell + pad, oy + i*cell + pad, ox + (j+1)*cell - pad, oy + (i+1)*cell - pad
+
+    @staticmethod
+    def _puntos_baldosa(x1, y1, x2, y2, r):
+        """Rectángulo redondeado como un solo polígono suave (los puntos repetidos fijan las rectas)."""
+        return (x1+r, y1, x1+r, y1, x2-r, y1, x2-r, y1, x2, y1, x2, y1+r, x2, y1+r, x2, y2-r,
+                x2, y2-r, x2, y2, x2-r, y2, x2-r, y2, x1+r, y2, x1+r, y2, x1, y2, x1, y2-r,
+                x1, y2-r, x1, y1+r, x1, y1+r, x1, y1)
+
     def _redibujar(self):
-        self.canvas.delete("all")
-        self._markers.clear()
+        """
+        Dibujo retenido: los ítems (baldosa + luz por celda) se crean sólo cuando cambia n;
+        al redimensionar se reubican con coords y los colores se actualizan por celda.
+        """
         n, cell, ox, oy = self._metricas()
-        self.rects = [[None]*n for _ in range(n)]
-        for i in range(n):
-            for j in range(n):
-                x1, y1 = ox + j*cell, oy + i*cell
-                x2, y2 = x1 + cell, y1 + cell
-                r = max(6, int(cell*0.18))
-               
-                self.canvas.create_rectangle(x1+r, y1, x2-r, y2, fill=TILE, outline=BORD, width=1)
-                self.canvas.create_rectangle(x1, y1+r, x2, y2-r, fill=TILE, outline=BORD, width=1)
-                self.canvas.create_oval(x1, y1, x1+2*r, y1+2*r, fill=TILE, outline=BORD, width=1)
-                self.canvas.create_oval(x2-2*r, y1, x2, y1+2*r, fill=TILE, outline=BORD, width=1)
-                self.canvas.create_oval(x2-2*r, y2-2*r, x2, y2, fill=TILE, outline=BORD, width=1)
-                self.canvas.create_oval(x1, y2-2*r, x1+2*r, y2, fill=TILE, outline=BORD, width=1)
-               
-                pad = max(5, int(cell*0.12))
-                fill = ON if self.tablero[i][j] else OFF
-                rect = self.canvas.create_rectangle(x1+pad, y1+pad, x2-pad, y2-pad, fill=fill, outline="")
-                self.rects[i][j] = rect
-
-        if self._ultima_sol:
-            self._marcar_solucion(self._ultima_sol)
-
-    def _refrescar_colores(self):
-        n, _, _, _ = self._metricas()
-        for i in range(n):
-            for j in range(n):
-                self.canvas.itemconfig(self.rects[i][j], fill=(ON if self.tablero[i][j] else OFF))
-
-    def _marcar_solucion(self, x_vec):
-        self._clear_markers()
-        n, cell, ox, oy = self._metricas()
-        pad = max(5, int(cell*0.12))
-        corner = max(10, int(cell * 0.28))
+        if self._n_items != n:
+            self.canvas.delete("all")
+            self.baldosas = [self.canvas.create_polygon(0, 0, 0, 0, smooth=True, fill=TILE, outline=BORD)
+                             for _ in range(n*n)]
+            self.luces = [self.canvas.create_rectangle(0, 0, 0, 0, fill=OFF, outline="") for _ in range(n*n)]
+            self._marcas = [self.canvas.create_rectangle(0, 0, 0, 0, fill=ACCENT, outline=ACCENT, stipple="gray25",
+                                                         state="hidden", tags="marca") for _ in range(n*n)]
+            self._marcadas = 0
+            self._colores = [OFF]*(n*n)
+            self._resaltado = self.canvas.create_rectangle(0, 0, 0, 0, fill=ACCENT, outline="", state="hidden")
+            self._n_items = n
+
+        r = max(min(6, cell//4), int(cell*0.18))
+        for k in range(n*n):
+            i, j = divmod(k, n)
+            x1, y1 = ox + j*cell, oy + i*cell
+            self.canvas.coords(self.baldosas[k], *self._puntos_baldosa(x1, y1, x1 + cell, y1 + cell, r))
+            caja = self._caja_luz(k, n, cell, ox, oy)
+            self.canvas.coords(self.luces[k], *caja)
+            self.canvas.coords(self._marcas[k], *caja)
+        self.canvas.itemconfig("marca", width=max(1, min(3, cell//10)))
+        self._refrescar_colores()
+        self._marcar_solucion(self._ultima_sol or 0)
 
-        for k, bit in enumerate(x_vec):
-            if bit != 1:
-                continue
+    def _refrescar_colores(self, celdas=None):
+        """Recolorea las celdas dadas (índices i*n + j; todas si es None), sólo las que cambiaron."""
+        n = len(self.tablero)
+        for k in (range(n*n) if celdas is None else celdas):
             i, j = divmod(k, n)
-            x1 = ox + j*cell + pad
-            y1 = oy + i*cell + pad
-            x2 = ox + (j+1)*cell - pad
-            y2 = oy + (i+1)*cell - pad
-
-            halo = self.canvas.create_rectangle(x1, y1, x2, y2, fill=ACCENT, outline="", stipple="gray25")
-            self._markers.append(halo)
-
-            
-            outer = self.canvas.create_rectangle(x1, y1, x2, y2, outline=ACCENT, width=3)
-            inner = self.canvas.create_rectangle(x1+2, y1+2, x2-2, y2-2, outline=ACCENT_LIGHT, width=1)
-            self._markers.extend([outer, inner])
-
-            
-            self._markers.append(self.canvas.create_line(x1, y1, x1+corner, y1, fill=ACCENT_LIGHT, width=3, capstyle="round"))
-            self._markers.append(self.canvas.create_line(x1, y1, x1, y1+corner, fill=ACCENT_LIGHT, width=3, capstyle="round"))
-            
-            self._markers.append(self.canvas.create_line(x2, y1, x2-corner, y1, fill=ACCENT_LIGHT, width=3, capstyle="round"))
-            self._markers.append(self.canvas.create_line(x2, y1, x2, y1+corner, fill=ACCENT_LIGHT, width=3, capstyle="round"))
-         
-            self._markers.append(self.canvas.create_line(x1, y2, x1+corner, y2, fill=ACCENT_LIGHT, width=3, capstyle="round"))
-            self._markers.append(self.canvas.create_line(x1, y2, x1, y2-corner, fill=ACCENT_LIGHT, width=3, capstyle="round"))
-            
-            self._markers.append(self.canvas.create_line(x2, y2, x2-corner, y2, fill=ACCENT_LIGHT, width=3, capstyle="round"))
-            self._markers.append(self.canvas.create_line(x2, y2, x2, y2-corner, fill=ACCENT_LIGHT, width=3, capstyle="round"))
+            color = ON if self.tablero[i][j] else OFF
+            if self._colores[k] != color:
+                self.canvas.itemconfig(self.luces[k], fill=color)
+                self._colores[k] = color
+
+    def _marcar_solucion(self, x_bits):
+        """Muestra la marca de cada celda a presionar (bitset); sólo se tocan las que cambian."""
+        cambios = x_bits ^ self._marcadas
+        while cambios:
+            bajo = cambios & -cambios
+            estado = "normal" if x_bits & bajo else "hidden"
+            self.canvas.itemconfig(self._marcas[bajo.bit_length() - 1], state=estado)
+            cambios ^= bajo
+        self._marcadas = x_bits
+
+    # ---------- solución viva: se actualiza en O(n²) bits por cada celda que cambia ----------
+    def _reiniciar_vivo(self):
+        """
+        Recalcula la solución viva desde cero (al cambiar n o reemplazar el tablero entero).
+        Si el plan de este n todavía no está, se pide al hilo de trabajo y se arma al llegar.
+        Si ya se está armando para este n, se deja seguir: al llegar se usa el tablero de ese momento.
+        """
+        n = len(self.tablero)
+        if self._columnas_n is not None and self._columnas_n[0] == n:
+            self._generacion += 1   # descarta el trabajo en curso para otro n, si lo hay
+            self._pedido_n = None
+            _, self._cols_pinv, self._cols_nulos = self._columnas_n
+            self._recalcular_vivo()
+            self._ocupado(False)
+            return
+        if self._pedido_n == n:
+            return
+        self._generacion += 1
+        self._pedido_n = n
+        self._cols_pinv = self._cols_nulos = None
+        self._pedidos.put((self._generacion, n))
+        self._ocupado(True)
+        if not self._sondeando:
+            self._sondeando = True
+            self.after(SONDEO_MS, self._sondear)
+
+    def _recalcular_vivo(self):
+        n = len(self.tablero)
+        self._x_vivo = self._sindrome = 0
+        for i, fila in enumerate(self.tablero):
+            for j, v in enumerate(fila):
+                if v:
+                    self._conmutar_vivo(i*n + j)
+
+    def _conmutar_vivo(self, k):
+        if self._cols_pinv is None:
+            return  # al llegar el plan se recalcula todo con el tablero de ese momento
+        self._x_vivo ^= self._cols_pinv[k]
+        self._sindrome ^= self._cols_nulos[k]
+
+    # ---------- hilo de trabajo ----------
+    def _trabajador(self):
+        while True:
+            gen, n = self._pedidos.get()
+            try:
+                while True:  # quedarse sólo con el pedido más nuevo
+                    gen, n = self._pedidos.get_nowait()
+            except queue.Empty:
+                pass
+            if gen != self._generacion:
+                continue
+            try:
+                # Si el usuario cambia n mientras tanto, _generacion avanza y el
+                # trabajo en curso se corta en la siguiente fila o franja para atender el pedido nuevo.
+                res = columnas_persecucion(n, cancelado=lambda: gen != self._generacion)
+            except Cancelado:
+                continue
+            except Exception as e:
+                res = e
+            self._resultados.put((gen, n, res))
+
+    def _sondear(self):
+        try:
+            while True:
+                gen, n, res = self._resultados.get_nowait()
+                if gen == self._generacion and n == len(self.tablero):
+                    self._plan_listo(n, res)
+        except queue.Empty:
+            pass
+        if self._esperando:
+            self.after(SONDEO_MS, self._sondear)
+        else:
+            self._sondeando = False
+
+    def _plan_listo(self, n, res):
+        self._pedido_n = None
+        self._ocupado(False)
+        if isinstance(res, Exception):
+            self.lbl_estado.configure(text="")
+            messagebox.showerror("Error", f"No se pudo preparar el plan para n={n}: {res}")
+            return
+        self._columnas_n = (n, *res)
+        self._cols_pinv, self._cols_nulos = res
+        self._recalcular_vivo()
+        self._mostrar_vivo()
+
+    def _ocupado(self, ocupado: bool):
+        """Indicador de trabajo en curso; mientras tanto no se puede calcular ni aplicar."""
+        if ocupado == self._esperando:
+            return
+        self._esperando = ocupado
+        state = "disabled" if ocupado else "normal"
+        for b in (self.btn_calc, self.btn_apply):
+            b.configure(state=state)
+        if ocupado:
+            self.progreso.pack(side=tk.LEFT, padx=6)
+            self.progreso.start(12)
+            self.lbl_estado.configure(text=f"Preparando plan para n={len(self.tablero)}…")
+            self._clear_markers()
+        else:
+            self.progreso.stop()
+            self.progreso.pack_forget()
+
+    def _solucion_viva(self):
+        """Presiones de la solución viva como bitset, o None si el tablero no tiene solución."""
+        if self._cols_pinv is None or self._sindrome:
+            return None
+        return self._x_vivo
+
+    def _mostrar_vivo(self):
+        if self._cols_pinv is None:
+            return
+        if self._sindrome:
+            self.lbl_estado.configure(text="Sin solución")
+        else:
+            self.lbl_estado.configure(text=f"Resoluble · {self._x_vivo.bit_count()} presiones")
+        if self.vivo.get() and not self._animando:
+            self._ultima_sol = self._solucion_viva()
+            if self._ultima_sol is None:
+                self._clear_markers()
+            else:
+                self._marcar_solucion(self._ultima_sol)
+
+    def _cambiar_vivo(self):
+        if self.vivo.get():
+            self._mostrar_vivo()
+        elif not self._animando:
+            self._ultima_sol = None
+            self._clear_markers()
 
     def _clear_markers(self):
-        for mid in self._markers:
-            self.canvas.delete(mid)
-        self._markers = []
+        self._marcar_solucion(0)
 
     def _click(self, e):
         if self._animando:
@@ -159,9 +311,12 @@ class App(tk.Tk):
         j = (e.x - ox)//cell
         if 0 <= i < n and 0 <= j < n:
             self.tablero[i][j] ^= 1
-            self._refrescar_colores()
-            self._ultima_sol = None
-            self._clear_markers()
+            self._conmutar_vivo(i*n + j)
+            self._refrescar_colores((i*n + j,))
+            if not self.vivo.get():
+                self._ultima_sol = None
+                self._clear_markers()
+            self._mostrar_vivo()   # con la solución en vivo, sólo cambian las marcas de x_viejo ⊕ x_nuevo
 
     def _cambiar_n(self):
         if self._animando:
@@ -174,31 +329,36 @@ class App(tk.Tk):
             messagebox.showerror("Valor inválido", f"n debe ser entero entre {MIN_N} y {MAX_N}.")
             return
         self.tablero = [[0]*nn for _ in range(nn)]
-        self._redibujar()
         self._ultima_sol = None
+        self._reiniciar_vivo()
+        self._redibujar()
+        self._mostrar_vivo()
 
     def _nuevo(self):
         if self._animando:
             return
         n = self.n.get()
         self.tablero = [[0]*n for _ in range(n)]
-        self._redibujar()
         self._ultima_sol = None
+        self._reiniciar_vivo()
+        self._redibujar()
+        self._mostrar_vivo()
 
     def _aleatorio(self):
         if self._animando:
             return
         n = self.n.get()
         self.tablero = [[1 if random.random() < 0.5 else 0 for _ in range(n)] for _ in range(n)]
-        self._redibujar()
         self._ultima_sol = None
+        self._reiniciar_vivo()
+        self._redibujar()
+        self._mostrar_vivo()
 
     def _calcular(self):
-        if self._animando:
+        if self._animando or self._cols_pinv is None:
             return
-        try:
-            x = resuelve_lights_out(self.tablero)
-        except Exception:
+        x = self._solucion_viva()
+        if x is None:
             messagebox.showwarning("Sin solución", "b ∉ Col(A). Este tablero no tiene solución.")
             self._ultima_sol = None
             self._clear_markers()
@@ -208,7 +368,7 @@ class App(tk.Tk):
         self._marcar_solucion(x)
 
     def _aplicar(self):
-        if self._animando:
+        if self._animando or self._cols_pinv is None:
             return
         x = self._ultima_sol
         if x is None:
@@ -217,11 +377,8 @@ class App(tk.Tk):
             if x is None:
                 return
 
-        coords = []
         n = self.n.get()
-        for k, bit in enumerate(x):
-            if bit == 1:
-                coords.append(divmod(k, n))
+        coords = [divmod(k, n) for k in range(n*n) if (x >> k) & 1]
 
         if not coords:
             messagebox.showinfo("Listo", "No hay celdas que presionar (ya está resuelto).")
@@ -236,12 +393,12 @@ class App(tk.Tk):
         if paso >= len(coords):
             self._animando = False
             self._toggle_botones(True)
-            self._refrescar_colores()
             if all(v == 0 for fila in self.tablero for v in fila):
                 messagebox.showinfo("Listo", "✔ Solución aplicada. Tablero en 0.")
             else:
                 messagebox.showwarning("Aviso", "Se aplicó la solución, pero no quedó todo en 0.")
             self._ultima_sol = None
+            self._mostrar_vivo()
             return
 
         i, j = coords[paso]
@@ -249,30 +406,30 @@ class App(tk.Tk):
         self.after(POST_HL_MS, lambda: self._aplicar_pulso_y_continuar(coords, paso, i, j))
 
     def _aplicar_pulso_y_continuar(self, coords, paso, i, j):
-        self._aplicar_pulso(i, j)
-        self._refrescar_colores()
+        self._refrescar_colores(self._aplicar_pulso(i, j))
+        self._mostrar_vivo()
         self.after(STEP_GAP_MS, lambda: self._animar_aplicacion(coords, paso+1))
 
     def _resaltar_celda(self, i, j):
         n, cell, ox, oy = self._metricas()
-        pad = max(5, int(cell*0.12))
-        x1 = ox + j*cell + pad
-        y1 = oy + i*cell + pad
-        x2 = ox + (j+1)*cell - pad
-        y2 = oy + (i+1)*cell - pad
-        hl = self.canvas.create_rectangle(x1, y1, x2, y2, fill=ACCENT, outline="")
-        self.after(HIGHLIGHT_MS, lambda: self.canvas.delete(hl))
+        self.canvas.coords(self._resaltado, *self._caja_luz(i*n + j, n, cell, ox, oy))
+        self.canvas.itemconfig(self._resaltado, state="normal")
+        self.canvas.tag_raise(self._resaltado)
+        self.after(HIGHLIGHT_MS, lambda: self.canvas.itemconfig(self._resaltado, state="hidden"))
 
     def _aplicar_pulso(self, i, j):
-        n = self.n.get()
-        for di, dj in ((0,0), (1,0), (-1,0), (0,1), (0,-1)):
-            r, c = i + di, j + dj
-            if 0 <= r < n and 0 <= c < n:
-                self.tablero[r][c] ^= 1
+        """Presiona (i,j) y devuelve las celdas que cambiaron."""
+        n = len(self.tablero)
+        topo = grilla_cuadrada(n)
+        topo.presionar_matriz(self.tablero, i, j)
+        cambiadas = topo.vecinos[i*n + j]
+        for k in cambiadas:
+            self._conmutar_vivo(k)
+        return cambiadas
 
     def _toggle_botones(self, enabled: bool):
         state = "normal" if enabled else "disabled"
-        for b in (self.btn_nuevo, self.btn_rand, self.btn_calc, self.btn_apply):
+        for b in (self.btn_nuevo, self.btn_rand, self.btn_calc, self.btn_apply, self.chk_vivo):
             b.configure(state=state)
         self.nspin.configure(state=("normal" if enabled else "disabled"))
 
@@ -0,0 +1,76 @@
+# lote_numpy.py
+# Camino opcional con NumPy para lotes de tableros n×n apilados en un arreglo (M, n, n) de uint8:
+# sorteo en una sola llamada al generador, aplicación de planes como convolución con la cruz de
+# topologias.CRUZ (XOR de cortes desplazados) y verificación de todo el lote con una sola reducción.
+# Sin NumPy instalado el módulo se importa igual; disponible() dice si se puede usar.
+from typing import List
+
+try:
+    import numpy as np
+except ImportError:  # dependencia opcional
+    np = None
+
+from topologias import CRUZ
+
+def disponible() -> bool:
+    return np is not None
+
+def _requerir():
+    if np is None:
+        raise RuntimeError("Este camino necesita NumPy (pip install numpy).")
+
+def tableros_aleatorios(m: int, n: int, rng=None) -> "np.ndarray":
+    """m tableros n×n uniformes como arreglo (m, n, n) de uint8, con una sola llamada a rng (np.random.Generator)."""
+    _requerir()
+    rng = np.random.default_rng() if rng is None else rng
+    return rng.integers(0, 2, size=(m, n, n), dtype=np.uint8)
+
+def _cortes(d: int, largo: int):
+    """(destino, origen) a lo largo de un eje para el desplazamiento d: origen[k] va a destino[k]."""
+    return slice(max(0, d), largo + min(0, d)), slice(max(0, -d), largo - max(0, d))
+
+def cruz(planes: "np.ndarray") -> "np.ndarray":
+    """
+    Celdas que cambian al presionar cada plan del lote: la convolución con la plantilla
+    topologias.CRUZ, módulo 2 (un XOR de cortes por desplazamiento).
+    """
+    _requerir()
+    _, m, n = planes.shape
+    out = np.zeros_like(planes)
+    for di, dj in CRUZ:
+        if abs(di) >= m or abs(dj) >= n:
+            continue
+        fd, fo = _cortes(di, m)
+        cd, co = _cortes(dj, n)
+        out[:, fd, cd] ^= planes[:, fo, co]
+    return out
+
+def aplicar_lote(tableros: "np.ndarray", planes: "np.ndarray") -> "np.ndarray":
+    """Estados finales tras aplicar planes[t] a tableros[t], para todo t a la vez."""
+    return tableros ^ cruz(planes)
+
+def verificar_lote(tableros: "np.ndarray", planes: "np.ndarray") -> "np.ndarray":
+    """Vector (M,) de bool: True donde el plan deja el tablero apagado."""
+    return ~aplicar_lote(tableros, planes).any(axis=(1, 2))
+
+# ---------- conversión con el formato rebanado por bits de PlanEliminacion.resolver_rebanadas ----------
+def rebanar(tableros: "np.ndarray") -> List[int]:
+    """columnas[k] con el bit t encendido si el tablero t tiene encendida la celda k."""
+    _requerir()
+    m, n, _ = tableros.shape
+    empaquetado = np.packbits(tableros.reshape(m, n * n), axis=0, bitorder="little")
+    return [int.from_bytes(fila.tobytes(), "little") for fila in np.ascontiguousarray(empaquetado.T)]
+
+def desrebanar(columnas: List[int], m: int, n: int) -> "np.ndarray":
+    """Inversa de rebanar: arreglo (m, n, n) de uint8."""
+    _requerir()
+    ancho = (m + 7) // 8
+    crudo = np.frombuffer(b"".join(c.to_bytes(ancho, "little") for c in columnas), dtype=np.uint8)
+    bits = np.unpackbits(crudo.reshape(n * n, ancho), axis=1, count=m, bitorder="little")
+    return np.ascontiguousarray(bits.T).reshape(m, n, n)
+
+def mascara_bits(bits: int, m: int) -> "np.ndarray":
+    """Vector (m,) de bool con el bit t de bits."""
+    _requerir()
+    crudo = np.frombuffer(bits.to_bytes((m + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(crudo, count=m, bitorder="little").astype(bool)
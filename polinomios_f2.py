@@ -0,0 +1,64 @@
+# polinomios_f2.py
+# Aritmética en 𝔽₂[x] con polinomios empaquetados en enteros: el bit i es el coeficiente de x^i.
+from typing import Tuple
+
+def grado(p: int) -> int:
+    """Grado de p (-1 para el polinomio nulo)."""
+    return p.bit_length() - 1
+
+def suma(a: int, b: int) -> int:
+    return a ^ b
+
+def producto(a: int, b: int) -> int:
+    """Producto sin acarreo: un XOR por cada término de b."""
+    if a.bit_length() < b.bit_length():
+        a, b = b, a
+    res = 0
+    while b:
+        bajo = b & -b
+        res ^= a << (bajo.bit_length() - 1)
+        b ^= bajo
+    return res
+
+def divmod_f2(a: int, b: int) -> Tuple[int, int]:
+    """(cociente, resto) de a entre b en 𝔽₂[x]."""
+    if b == 0:
+        raise ZeroDivisionError("división por el polinomio nulo")
+    gb = grado(b)
+    q = 0
+    while a and grado(a) >= gb:
+        s = grado(a) - gb
+        q |= 1 << s
+        a ^= b << s
+    return q, a
+
+def resto(a: int, b: int) -> int:
+    return divmod_f2(a, b)[1]
+
+def mcd(a: int, b: int) -> int:
+    """Máximo común divisor (mónico: en 𝔽₂ todo polinomio no nulo lo es)."""
+    while b:
+        a, b = b, resto(a, b)
+    return a
+
+def chebyshev_f2(n: int) -> Tuple[int, int]:
+    """
+    (p_n(x), p_n(x+1)) con p_0 = 1, p_1 = x, p_{k+1} = x·p_k + p_{k-1}: el polinomio característico
+    del camino de n vértices sobre 𝔽₂. Las dos sucesiones se arman juntas en O(n) pasos.
+    """
+    if n == 0:
+        return 1, 1
+    p0, p1 = 1, 0b10
+    q0, q1 = 1, 0b11
+    for _ in range(n - 1):
+        p0, p1 = p1, (p1 << 1) ^ p0
+        q0, q1 = q1, (q1 << 1) ^ q1 ^ q0
+    return p1, q1
+
+def nulidad_lights_out(n: int) -> int:
+    """
+    Nulidad de la matriz de Lights Out n×n sobre 𝔽₂: A = I⊗(B+I) + B⊗I con B el camino de n
+    vértices, y su núcleo tiene dimensión grado(mcd(p_n(x), p_n(x+1))). Cuesta O(n²/64) palabras.
+    """
+    p, q = chebyshev_f2(n)
+    return grado(mcd(p, q))
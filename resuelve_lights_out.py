@@ -1,122 +1,736 @@
 # resuelve_lights_out.py
 # Función que resuelve Lights Out con Gauss en 𝔽₂ usando SOLO sumas de filas (Fi <- Fi + Fj).
-from typing import List
+import argparse
+import json
+import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
 
-def resuelve_lights_out(tablero: List[List[int]]) -> List[int]:
+import almacen_planes
+from eliminacion_f2 import Cancelado, eliminar_por_bloques, trasponer
+from tablero import INVERSA_SIMETRIA, Tablero, aplicar_simetria, simetrias_bits
+from topologias import Topologia, grilla_cuadrada
+
+# ---------- construcción de A (filas como bitsets) y b ----------
+def construir_A_bitfilas(n: int) -> List[int]:
+    """
+    Devuelve A como lista de filas en bitset (int) de tamaño n^2.
+    Sale de la adyacencia dispersa de la grilla n×n (ver topologias.py), en O(n²) total.
+    """
+    return grilla_cuadrada(n).matriz_bitfilas()
+
+def _construir_b_bits(tab: List[List[int]]) -> int:
+    n = len(tab)
+    b = 0
+    for i in range(n):
+        for j in range(n):
+            if tab[i][j] & 1:
+                b |= (1 << (i*n + j))
+    return b
+
+def _leer_tablero(tablero) -> Tuple[int, int]:
+    """(n, b como bitset) de un Tablero o de una matriz n×n de 0/1."""
+    if isinstance(tablero, Tablero):
+        return tablero.n, tablero.bits
+    if not tablero or any(len(f) != len(tablero) for f in tablero):
+        raise ValueError("El tablero debe ser una matriz n×n de 0/1.")
+    return len(tablero), _construir_b_bits(tablero)
+
+def _bits_a_vector(x_bits: int, n: int) -> List[int]:
+    tam = n * n
+    return [(x_bits >> k) & 1 for k in range(tam)]
+
+
+# ---------- perfilado opcional ----------
+class PerfilSolver:
+    """
+    Acumula tiempo por fase y contadores de las resoluciones a las que se le pase (parámetro perfil).
+    Si no se pasa perfil, el solver no mide nada.
+    Fases: construccion_A, eliminacion, nucleo (sólo al armar un plan nuevo), lectura_almacen,
+    consistencia, sustitucion, rebanado, persecucion.
+    Contadores: xors (sumas de filas), sondeos (filas revisadas buscando pivote), rango,
+    planes_construidos, planes_en_cache, planes_en_disco, tableros.
+    """
+    def __init__(self):
+        self.tiempos: Dict[str, float] = {}
+        self.contadores: Dict[str, int] = {}
+
+    def sumar_tiempo(self, fase: str, segundos: float):
+        self.tiempos[fase] = self.tiempos.get(fase, 0.0) + segundos
+
+    def contar(self, nombre: str, cantidad: int = 1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def combinar(self, otro: "PerfilSolver"):
+        for fase, t in otro.tiempos.items():
+            self.sumar_tiempo(fase, t)
+        for nombre, c in otro.contadores.items():
+            self.contar(nombre, c)
+
+    def resumen(self) -> str:
+        lineas = [f"  {fase:<18s} {t * 1e3:12.3f} ms" for fase, t in self.tiempos.items()]
+        lineas += [f"  {nombre:<18s} {c:12d}" for nombre, c in self.contadores.items()]
+        return "\n".join(lineas)
+
+
+# ---------- plan de eliminación por tamaño ----------
+class PlanEliminacion:
+    """
+    Eliminación de Gauss de A hecha una sola vez (para Lights Out clásico, A n²×n² depende sólo de n).
+    Se registran las sumas de filas aplicadas (matriz T, con T·A = R
+    escalonada reducida) y resolver un tablero se reduce a aplicar T al vector b.
+    Atributos (bitsets sobre las celdas):
+      pinv:    lista de (col, fila_T); x[col] = <fila_T, b> es la solución con libres = 0
+      nulos:   filas de T cuyas filas de R quedaron nulas; b tiene solución sii <fila, b> = 0 en todas
+      pivotes: columnas pivote de R, en orden creciente
+      nucleo:  base del núcleo de A, un vector por columna libre
+      perfil:  PerfilSolver con lo que costó armar el plan (se mide una sola vez, al construirlo)
+    """
+    __slots__ = ("tam", "pinv", "nulos", "pivotes", "nucleo", "perfil")
+
+    def __init__(self, A_bits: List[int]):
+        """A_bits: filas de A como bitsets (A cuadrada, tam×tam)."""
+        self.tam = tam = len(A_bits)
+        self.perfil = perfil = PerfilSolver()
+        t0 = time.perf_counter()
+
+        # ---------- Gauss-Jordan en 𝔽₂ por bloques, SOLO con Fi <- Fi + Fj (XOR) ----------
+        # Cada fila lleva a T (la identidad al principio) en los bits desde tam: [A | I] -> [R | T].
+        filas = [A_bits[r] | (1 << (tam + r)) for r in range(tam)]
+        columnas_pivote, xors, sondeos = eliminar_por_bloques(filas, tam)
+        mascara = (1 << tam) - 1
+        A = [f & mascara for f in filas]
+        T = [f >> tam for f in filas]
+        t2 = time.perf_counter()
+        perfil.sumar_tiempo("eliminacion", t2 - t0)
+
+        self.pivotes = [c for _, c in columnas_pivote]
+        self.pinv = [(c, T[r]) for r, c in columnas_pivote]
+        self.nulos = [T[r] for r in range(tam) if A[r] == 0]
+        # Variable libre f = 1, resto de libres = 0: x[c] = R[r][f] en cada pivote (r, c)
+        es_pivote = set(self.pivotes)
+        self.nucleo = []
+        for f in range(tam):
+            if f in es_pivote:
+                continue
+            v = 1 << f
+            for r, c in columnas_pivote:
+                if (A[r] >> f) & 1:
+                    v |= 1 << c
+            self.nucleo.append(v)
+        perfil.sumar_tiempo("nucleo", time.perf_counter() - t2)
+        perfil.contar("xors", xors)
+        perfil.contar("sondeos", sondeos)
+        perfil.contar("rango", len(self.pivotes))
+
+    @classmethod
+    def desde_datos(cls, tam: int, pivotes: List[int], filas_pinv: List[int], nulos: List[int],
+                    nucleo: List[int]) -> "PlanEliminacion":
+        """Rearma un plan ya calculado (p. ej. leído del almacén en disco) sin volver a eliminar."""
+        plan = cls.__new__(cls)
+        plan.tam = tam
+        plan.pivotes = list(pivotes)
+        plan.pinv = list(zip(pivotes, filas_pinv))
+        plan.nulos = nulos
+        plan.nucleo = nucleo
+        plan.perfil = PerfilSolver()
+        return plan
+
+    @property
+    def rango(self) -> int:
+        return len(self.pivotes)
+
+    @property
+    def nulidad(self) -> int:
+        return self.tam - len(self.pivotes)
+
+    def bytes_aprox(self) -> int:
+        """Memoria aproximada que ocupan los bitsets guardados."""
+        por_fila = (self.tam + 7) // 8 + 32
+        return por_fila * (len(self.pinv) + len(self.nulos) + len(self.nucleo))
+
+    def resolver_bits(self, b_bits: int, perfil: Optional[PerfilSolver] = None) -> int:
+        """
+        Aplica T a b (como bitset). Devuelve x como bitset (libres = 0).
+        Lanza ValueError si b ∉ Col(A).
+        """
+        if perfil is not None:
+            t0 = time.perf_counter()
+        for q in self.nulos:
+            if (q & b_bits).bit_count() & 1:
+                raise ValueError("Sin solución: b no pertenece al espacio columna de A (b ∉ Col(A)).")
+        if perfil is not None:
+            t1 = time.perf_counter()
+            perfil.sumar_tiempo("consistencia", t1 - t0)
+        x_bits = 0
+        for c, fila_T in self.pinv:
+            if (fila_T & b_bits).bit_count() & 1:
+                x_bits |= (1 << c)
+        if perfil is not None:
+            perfil.sumar_tiempo("sustitucion", time.perf_counter() - t1)
+            perfil.contar("tableros")
+        return x_bits
+
+    def resolver_rebanadas(self, columnas: List[int], perfil: Optional[PerfilSolver] = None) -> Tuple[List[int], int]:
+        """
+        Versión por lotes de resolver_bits con b "rebanado por bits": columnas[k] tiene el bit t
+        encendido si el tablero t tiene encendida la celda k. Cada suma de filas se hace una sola
+        vez para todo el lote (un XOR de enteros anchos).
+        Devuelve (x_cols, sin_solucion): x_cols[c] rebanado igual que b; sin_solucion tiene el
+        bit t encendido si el tablero t no tiene solución.
+        """
+        def combinar(mascara: int) -> int:
+            acc = 0
+            while mascara:
+                bajo = mascara & -mascara
+                acc ^= columnas[bajo.bit_length() - 1]
+                mascara ^= bajo
+            return acc
+
+        if perfil is not None:
+            t0 = time.perf_counter()
+        sin_solucion = 0
+        for q in self.nulos:
+            sin_solucion |= combinar(q)
+        if perfil is not None:
+            t1 = time.perf_counter()
+            perfil.sumar_tiempo("consistencia", t1 - t0)
+        x_cols = [0] * self.tam
+        for c, fila_T in self.pinv:
+            x_cols[c] = combinar(fila_T)
+        if perfil is not None:
+            perfil.sumar_tiempo("sustitucion", time.perf_counter() - t1)
+        return x_cols, sin_solucion
+
+
+# Caché LRU de planes (por n, o por clave de topología), acotada en cantidad y en memoria.
+CACHE_MAX_PLANES = 16
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+_cache_planes: "OrderedDict[Hashable, PlanEliminacion]" = OrderedDict()
+
+# Almacén en disco opcional (ver almacen_planes.py; se activa con LIGHTS_OUT_ALMACEN): los planes
+# por n se guardan al construirlos y los procesos siguientes los leen en vez de eliminar de nuevo.
+# Para n chicos armarlos es más barato.
+ALMACEN_N_MIN = 12
+
+def _plan_del_almacen(n: int, perfil: Optional[PerfilSolver] = None) -> Optional[PlanEliminacion]:
+    directorio = almacen_planes.directorio_almacen()
+    if directorio is None or n < ALMACEN_N_MIN:
+        return None
+    if perfil is not None:
+        t0 = time.perf_counter()
+    datos = almacen_planes.cargar_plan(almacen_planes.ruta_plan(directorio, n), n * n)
+    if datos is None:
+        return None
+    plan = PlanEliminacion.desde_datos(n * n, *datos)
+    if perfil is not None:
+        perfil.sumar_tiempo("lectura_almacen", time.perf_counter() - t0)
+        perfil.contar("planes_en_disco")
+    return plan
+
+def _guardar_en_almacen(n: int, plan: PlanEliminacion):
+    directorio = almacen_planes.directorio_almacen()
+    if directorio is None or n < ALMACEN_N_MIN:
+        return
+    try:
+        almacen_planes.guardar_plan(almacen_planes.ruta_plan(directorio, n), plan.tam, plan.pivotes,
+                                    [f for _, f in plan.pinv], plan.nulos, plan.nucleo)
+    except OSError:
+        pass  # el almacén es sólo un atajo: sin permisos o sin espacio se sigue con el plan en memoria
+
+def _plan_cacheado(clave: Hashable, construir_A, perfil: Optional[PerfilSolver] = None,
+                   n_almacen: Optional[int] = None) -> PlanEliminacion:
+    plan = _cache_planes.get(clave)
+    if plan is not None:
+        _cache_planes.move_to_end(clave)
+        if perfil is not None:
+            perfil.contar("planes_en_cache")
+        return plan
+    if n_almacen is not None:
+        plan = _plan_del_almacen(n_almacen, perfil)
+    if plan is None:
+        if perfil is not None:
+            t0 = time.perf_counter()
+        A = construir_A()
+        if perfil is not None:
+            perfil.sumar_tiempo("construccion_A", time.perf_counter() - t0)
+        plan = PlanEliminacion(A)
+        if perfil is not None:
+            perfil.combinar(plan.perfil)
+            perfil.contar("planes_construidos")
+        if n_almacen is not None:
+            _guardar_en_almacen(n_almacen, plan)
+    _cache_planes[clave] = plan
+    # Desalojar los menos usados; el recién creado se conserva aunque exceda el tope.
+    while len(_cache_planes) > 1 and (
+        len(_cache_planes) > CACHE_MAX_PLANES
+        or sum(p.bytes_aprox() for p in _cache_planes.values()) > CACHE_MAX_BYTES
+    ):
+        _cache_planes.popitem(last=False)
+    return plan
+
+def plan_eliminacion(n: int, perfil: Optional[PerfilSolver] = None) -> PlanEliminacion:
+    """
+    Devuelve el plan de eliminación para tamaño n: de la caché en memoria, si no del almacén en
+    disco, y si tampoco está ahí lo construye (y lo guarda en ambos).
+    """
+    return _plan_cacheado(n, lambda: construir_A_bitfilas(n), perfil, n_almacen=n)
+
+def plan_topologia(topologia: Topologia) -> PlanEliminacion:
+    """Igual que plan_eliminacion, para una topología cualquiera."""
+    return _plan_cacheado(topologia.clave, topologia.matriz_bitfilas)
+
+def limpiar_cache_planes():
+    _cache_planes.clear()
+
+
+# ---------- persecución de luces (reducción a la primera fila) ----------
+def _filas_bits(b_bits: int, n: int) -> List[int]:
+    mascara = (1 << n) - 1
+    return [(b_bits >> (i * n)) & mascara for i in range(n)]
+
+def _perseguir(filas_b: List[int], p0: int, n: int) -> Tuple[List[int], int]:
+    """
+    Presiona p0 en la fila 0 y, en cada fila i ≥ 1, justo debajo de las luces que quedaron
+    encendidas en la fila i-1 (eso las apaga). Filas y presiones son bitsets de n bits.
+    Devuelve (presiones por fila, residuo de la última fila).
+    """
+    mascara = (1 << n) - 1
+    estado = filas_b[:]
+    presiones = []
+    p = p0
+    for i in range(n):
+        presiones.append(p)
+        estado[i] ^= (p ^ (p << 1) ^ (p >> 1)) & mascara
+        if i + 1 < n:
+            estado[i + 1] ^= p
+            p = estado[i]
+    return presiones, estado[n - 1]
+
+@lru_cache(maxsize=32)
+def _preparar_persecucion(n: int) -> Tuple[Dict[int, Tuple[int, int]], Dict[int, int]]:
+    """
+    El residuo de la última fila es afín en las presiones p de la primera fila:
+    residuo(b, p) = residuo(b, 0) + Σ_{v ∈ p} residuo(0, e_v). Devuelve:
+      base:  base escalonada (bit alto -> (residuo, etiqueta)) de los residuos residuo(0, e_v);
+             la etiqueta es el p que lo produce
+      libres: núcleo de A en forma reducida, columna libre f -> vector con bit f y sin otras libres
+    """
+    ceros = [0] * n
+    base: Dict[int, Tuple[int, int]] = {}
+    etiquetas_nulas = []
+    for v in range(n):
+        _, r = _perseguir(ceros, 1 << v, n)
+        t = 1 << v
+        while r:
+            h = r.bit_length() - 1
+            if h not in base:
+                base[h] = (r, t)
+                break
+            br, bt = base[h]
+            r ^= br
+            t ^= bt
+        else:
+            etiquetas_nulas.append(t)
+
+    # Los p con residuo nulo generan los patrones quietos. Reducidos por bit más alto, ese bit es
+    # justamente una columna libre de la forma escalonada reducida de A.
+    libres: Dict[int, int] = {}
+    for t in etiquetas_nulas:
+        presiones, _ = _perseguir(ceros, t, n)
+        v = 0
+        for i, p in enumerate(presiones):
+            v |= p << (i * n)
+        for h in sorted(libres, reverse=True):
+            if (v >> h) & 1:
+                v ^= libres[h]
+        h = v.bit_length() - 1
+        for g in libres:
+            if (libres[g] >> h) & 1:
+                libres[g] ^= v
+        libres[h] = v
+    return base, libres
+
+def _resolver_persecucion_bits(b_bits: int, n: int) -> int:
+    """Igual que PlanEliminacion.resolver_bits pero resolviendo sólo un sistema n×n."""
+    base, libres = _preparar_persecucion(n)
+    filas_b = _filas_bits(b_bits, n)
+    _, r = _perseguir(filas_b, 0, n)
+    p0 = 0
+    while r:
+        h = r.bit_length() - 1
+        if h not in base:
+            raise ValueError("Sin solución: b no pertenece al espacio columna de A (b ∉ Col(A)).")
+        br, bt = base[h]
+        r ^= br
+        p0 ^= bt
+    presiones, _ = _perseguir(filas_b, p0, n)
+    x_bits = 0
+    for i, p in enumerate(presiones):
+        x_bits |= p << (i * n)
+    return _libres_en_cero(x_bits, n)
+
+def _libres_en_cero(x_bits: int, n: int) -> int:
+    """Lleva una solución cualquiera a la que tiene variables libres = 0 (la misma que da Gauss)."""
+    for f, v in _preparar_persecucion(n)[1].items():
+        if (x_bits >> f) & 1:
+            x_bits ^= v
+    return x_bits
+
+
+def _perseguir_rebanado(filas_b: List[List[int]], p0: List[int], n: int,
+                        cancelado: Optional[Callable[[], bool]] = None) -> Tuple[List[List[int]], List[int]]:
+    """
+    _perseguir con las celdas rebanadas por bits: filas_b[i][j] y p0[j] son enteros con un bit por
+    tablero, así muchos tableros se persiguen a la vez con O(n²) XOR de enteros anchos.
+    Devuelve (presiones[i][j], residuo[j]); cancelado se consulta en cada fila.
+    """
+    estado = [fila[:] for fila in filas_b]
+    presiones = []
+    p = p0
+    for i in range(n):
+        if cancelado is not None and cancelado():
+            raise Cancelado()
+        presiones.append(p)
+        fila = estado[i]
+        for j in range(n):
+            v = p[j]
+            if j > 0:
+                v ^= p[j - 1]
+            if j + 1 < n:
+                v ^= p[j + 1]
+            fila[j] ^= v
+        if i + 1 < n:
+            siguiente = estado[i + 1]
+            for j in range(n):
+                siguiente[j] ^= p[j]
+            p = fila
+    return presiones, estado[n - 1]
+
+def columnas_persecucion(n: int, cancelado: Optional[Callable[[], bool]] = None) -> Tuple[List[int], List[int]]:
+    """
+    (columnas_pinv, columnas_nulos) para la solución en vivo, sin armar el plan n²×n²: persigue a la
+    vez los n² tableros de una sola luz (uno por bit) y traspone. Por linealidad, cambiar la celda k
+    de b cambia la solución en columnas_pinv[k] y el síndrome en columnas_nulos[k]: para un tablero
+    con solución, el XOR de sus columnas_pinv es la solución con libres = 0 (la de
+    plan_eliminacion), y el síndrome (bits de residuo fuera de la base) es 0 sii tiene solución.
+    Cuesta O(n²) operaciones sobre enteros de n² bits más la traspuesta. Lanza Cancelado si cancelado() devuelve True (se consulta a menudo).
+    """
+    tam = n * n
+    base, libres = _preparar_persecucion(n)
+    unos = [[1 << (i * n + j) for j in range(n)] for i in range(n)]
+    _, residuo = _perseguir_rebanado(unos, [0] * n, n, cancelado)
+
+    # La reducción contra la base escalonada es lineal si los bits fuera de la base se apartan
+    # (en vez de lanzar "sin solución"): se reduce cada bit j del residuo y se suma por tableros.
+    p0 = [0] * n
+    sindrome: Dict[int, int] = {}
+    for j in range(n):
+        if not residuo[j]:
+            continue
+        r, t = 1 << j, 0
+        while r:
+            h = r.bit_length() - 1
+            if h in base:
+                br, bt = base[h]
+                r ^= br
+                t ^= bt
+            else:
+                sindrome[h] = sindrome.get(h, 0) ^ residuo[j]
+                r ^= 1 << h
+        while t:
+            bajo = t & -t
+            p0[bajo.bit_length() - 1] ^= residuo[j]
+            t ^= bajo
+
+    presiones, _ = _perseguir_rebanado(unos, p0, n, cancelado)
+    x = [p for fila in presiones for p in fila]  # x[c]: bit k = la solución de e_k presiona c
+    for f, v in libres.items():  # llevar cada tablero a libres = 0
+        m = x[f]
+        while m and v:
+            bajo = v & -v
+            x[bajo.bit_length() - 1] ^= m
+            v ^= bajo
+    return trasponer(x, tam, cancelado=cancelado), trasponer(list(sindrome.values()), tam, cancelado=cancelado)
+
+
+def patrones_quietos(n: int) -> List[int]:
+    """Base del núcleo de A para tamaño n (patrones quietos), como bitsets de n² bits. Cacheada por n."""
+    return list(_preparar_persecucion(n)[1].values())
+
+def es_resoluble(tablero) -> bool:
+    """
+    Indica si el tablero tiene solución, sin resolverlo.
+    Como A es simétrica, b ∈ Col(A) sii b es ortogonal (en 𝔽₂) a todos los patrones quietos:
+    basta con nulidad productos AND + paridad sobre el tablero como bitset.
+    Acepta un Tablero o una matriz n×n de 0/1.
+    Lanza:
+      ValueError si el tablero no es una matriz n×n.
+    """
+    n, b_bits = _leer_tablero(tablero)
+    for q in _preparar_persecucion(n)[1].values():
+        if (q & b_bits).bit_count() & 1:
+            return False
+    return True
+
+
+# ---------- solución de mínimo número de presiones ----------
+PRESUPUESTO_OPTIMO_S = 2.0
+
+def _recorrido_gray(x_bits: int, base: List[int]):
+    """Recorre x ⊕ span(base) en orden de Gray: un solo XOR por paso, 2^len(base) elementos."""
+    yield x_bits
+    for i in range(1, 1 << len(base)):
+        x_bits ^= base[(i & -i).bit_length() - 1]
+        yield x_bits
+
+def _minimizar_presiones(x_bits: int, n: int, presupuesto_s: float = PRESUPUESTO_OPTIMO_S) -> Tuple[int, bool]:
+    """
+    Busca la solución de menor peso (popcount) en x ⊕ Ker(A).
+    Recorre las 2^nulidad soluciones mientras alcance el presupuesto de tiempo; si se agota,
+    sigue con descenso local (sumar patrones quietos mientras baje el peso).
+    Devuelve (mejor x, exacto) con exacto=True si se recorrieron todas.
+    """
+    base = patrones_quietos(n)
+    mejor, peso_mejor = x_bits, x_bits.bit_count()
+    limite = time.perf_counter() + presupuesto_s
+    exacto = True
+    for paso, x in enumerate(_recorrido_gray(x_bits, base)):
+        peso = x.bit_count()
+        if peso < peso_mejor:
+            mejor, peso_mejor = x, peso
+        if paso & 0xFFF == 0xFFF and time.perf_counter() > limite:
+            exacto = False
+            break
+    if not exacto:
+        mejora = True
+        while mejora:
+            mejora = False
+            for q in base:
+                peso = (mejor ^ q).bit_count()
+                if peso < peso_mejor:
+                    mejor, peso_mejor, mejora = mejor ^ q, peso, True
+    return mejor, exacto
+
+
+def resuelve_lights_out(tablero, metodo: str = "gauss", optimo: bool = False,
+                        perfil: Optional[PerfilSolver] = None):
     """
     Resuelve Lights Out sobre 𝔽₂ mediante eliminación gaussiana usando únicamente sumas de filas (XOR).
-    Parámetro:
-      tablero: matriz n×n con 0/1 que representa el estado inicial (1 = luz encendida)
+    La eliminación se hace una vez por tamaño n (ver plan_eliminacion); cada tablero sólo paga
+    aplicar las sumas registradas a su vector b.
+    Parámetros:
+      tablero: matriz n×n con 0/1 que representa el estado inicial (1 = luz encendida),
+               o un Tablero (bitboard)
+      metodo:  "gauss" (sistema n²×n²) o "chase" (persecución de luces: sistema n×n sobre las
+               presiones de la primera fila, O(n³) operaciones de bits; apto para n grandes)
+      optimo:  si es True, devuelve la solución con menos presiones (ver _minimizar_presiones);
+               si no, la que tiene variables libres = 0
+      perfil:  PerfilSolver opcional donde acumular tiempos por fase y contadores
     Devuelve:
-      x: vector de largo n^2 con 0/1; x[k]=1 indica presionar la celda k (orden por filas, 0-based)
+      x: vector de largo n^2 con 0/1; x[k]=1 indica presionar la celda k (orden por filas, 0-based).
+         Si tablero es un Tablero, x es un Tablero con las celdas a presionar.
     Lanza:
       ValueError si el sistema es inconsistente (no tiene solución).
     """
+    n, b_bits = _leer_tablero(tablero)
+    _validar_metodo(metodo)
+    return _salida(tablero, n, _resolver_bits(n, b_bits, metodo, perfil), optimo)
 
-    # ---------- utilidades de índice y vecindad ----------
-    def a_indice(i: int, j: int, n: int) -> int:
-        return i * n + j
+def _validar_metodo(metodo: str):
+    if metodo not in ("gauss", "chase"):
+        raise ValueError(f"Método desconocido: {metodo!r} (use 'gauss' o 'chase').")
 
-    def vecinos_cruz(i: int, j: int, n: int):
-        for di, dj in ((0,0), (1,0), (-1,0), (0,1), (0,-1)):
-            r, c = i + di, j + dj
-            if 0 <= r < n and 0 <= c < n:
-                yield r, c
+def _resolver_bits(n: int, b_bits: int, metodo: str, perfil: Optional[PerfilSolver]) -> int:
+    if metodo == "gauss":
+        return plan_eliminacion(n, perfil).resolver_bits(b_bits, perfil)
+    if perfil is not None:
+        t0 = time.perf_counter()
+    x_bits = _resolver_persecucion_bits(b_bits, n)
+    if perfil is not None:
+        perfil.sumar_tiempo("persecucion", time.perf_counter() - t0)
+        perfil.contar("tableros")
+    return x_bits
 
-    # ---------- construcción de A (filas como bitsets) y b ----------
-    def construir_A_bitfilas(n: int):
-        tam = n * n
-        A_bits = [0] * tam
-        for i in range(n):
-            for j in range(n):
-                fila = a_indice(i, j, n)
-                bitfila = 0
-                # Columna (r,c) afecta a (i,j) si (i,j) está en la "cruz" de (r,c)
-                for r in range(n):
-                    for c in range(n):
-                        if (i, j) in vecinos_cruz(r, c, n):
-                            col = a_indice(r, c, n)
-                            bitfila |= (1 << col)
-                A_bits[fila] = bitfila
-        return A_bits
-
-    def construir_b_bits(tab: List[List[int]]) -> int:
-        n = len(tab)
-        b = 0
-        for i in range(n):
-            for j in range(n):
-                if tab[i][j] & 1:
-                    b |= (1 << (i*n + j))
-        return b
+def _salida(tablero, n: int, x_bits: int, optimo: bool):
+    """x en el formato de la entrada (Tablero o vector), minimizando presiones si optimo."""
+    if optimo:
+        x_bits, _ = _minimizar_presiones(x_bits, n)
+    if isinstance(tablero, Tablero):
+        return Tablero(n, x_bits)
+    return _bits_a_vector(x_bits, n)
 
-    def bits_a_vector(x_bits: int, n: int) -> List[int]:
-        tam = n * n
-        return [(x_bits >> k) & 1 for k in range(tam)]
 
-    # ---------- validaciones y armado ----------
-    if not tablero or any(len(f) != len(tablero) for f in tablero):
-        raise ValueError("El tablero debe ser una matriz n×n de 0/1.")
+# ---------- caché de soluciones por simetría ----------
+CACHE_MAX_SOLUCIONES = 100_000
+_AUSENTE = object()
 
-    n = len(tablero)
-    A = construir_A_bitfilas(n)
-    b_bits = construir_b_bits(tablero)
-    tam = n * n
+class CacheSoluciones:
+    """
+    LRU de soluciones indexada por (n, representante canónico): el menor bitboard entre las 8
+    imágenes del tablero por las simetrías del cuadrado. A conmuta con esas simetrías, así que si
+    x resuelve g(b), g⁻¹(x) resuelve b; después se lleva a libres = 0 con el núcleo reducido y el
+    resultado es el mismo que resolviendo directo. Los tableros sin solución también se guardan.
+    """
+    def __init__(self, max_entradas: int = CACHE_MAX_SOLUCIONES):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[Tuple[int, int], Optional[int]]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
 
-    b = [(b_bits >> i) & 1 for i in range(tam)]
-    A = A[:]  # copia
+    @staticmethod
+    def _clave(n: int, b_bits: int) -> Tuple[Tuple[int, int], int]:
+        imagenes = simetrias_bits(b_bits, n)
+        g = min(range(8), key=imagenes.__getitem__)
+        return (n, imagenes[g]), g
 
-    # ---------- Gauss en 𝔽₂ usando SOLO Fi <- Fi + Fj (XOR) ----------
-    fila = 0
-    for col in range(tam):
-        if fila >= tam:
-            break
-        # Activar pivote en (fila, col) sumando alguna fila inferior con 1 en esa columna
-        if ((A[fila] >> col) & 1) == 0:
-            origen = -1
-            for r in range(fila + 1, tam):
-                if ((A[r] >> col) & 1) == 1:
-                    origen = r
-                    break
-            if origen != -1:
-                A[fila] ^= A[origen]
-                b[fila] ^= b[origen]
-        # Si sigue 0, no hay pivote en esta columna
-        if ((A[fila] >> col) & 1) == 0:
-            continue
-        # Eliminar debajo del pivote
-        for r in range(fila + 1, tam):
-            if ((A[r] >> col) & 1) == 1:
-                A[r] ^= A[fila]
-                b[r] ^= b[fila]
-        fila += 1
-
-    # Inconsistencia: fila de A nula con término independiente 1
-    for r in range(tam):
-        if A[r] == 0 and b[r] == 1:
-            raise ValueError("Sin solución: b no pertenece al espacio columna de A (b ∉ Col(A)).")
+    def resolver_bits(self, n: int, b_bits: int, resolver) -> Optional[int]:
+        """
+        x (libres = 0) del tablero b_bits, o None si no tiene solución. Si no está en la caché
+        se calcula con resolver(n, b_bits), que lanza ValueError si no hay solución.
+        """
+        clave, g = self._clave(n, b_bits)
+        guardado = self._entradas.get(clave, _AUSENTE)
+        if guardado is not _AUSENTE:
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            if guardado is None:
+                return None
+            return _libres_en_cero(aplicar_simetria(guardado, n, INVERSA_SIMETRIA[g]), n)
+        self.fallos += 1
+        try:
+            x_bits = resolver(n, b_bits)
+        except ValueError:
+            x_bits = None
+        self._entradas[clave] = None if x_bits is None else aplicar_simetria(x_bits, n, g)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+        return x_bits
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": len(self._entradas)}
+
+    def limpiar(self):
+        self._entradas.clear()
+        self.aciertos = self.fallos = 0
+
+cache_soluciones = CacheSoluciones()
+
+def resuelve_lights_out_cacheado(tablero, metodo: str = "gauss", optimo: bool = False,
+                                 perfil: Optional[PerfilSolver] = None):
+    """
+    Igual que resuelve_lights_out, pero consultando antes cache_soluciones: un tablero repetido,
+    o igual a otro salvo rotación o reflexión, cuesta una búsqueda en un diccionario.
+    """
+    n, b_bits = _leer_tablero(tablero)
+    _validar_metodo(metodo)
+    x_bits = cache_soluciones.resolver_bits(n, b_bits, lambda n_, b_: _resolver_bits(n_, b_, metodo, perfil))
+    if x_bits is None:
+        raise ValueError("Sin solución: b no pertenece al espacio columna de A (b ∉ Col(A)).")
+    return _salida(tablero, n, x_bits, optimo)
+
+
+def todas_las_soluciones(tablero, como_bits: bool = False) -> Iterator:
+    """
+    Itera perezosamente todas las soluciones del tablero: la particular (libres = 0) y luego el
+    resto de x ⊕ Ker(A) en orden de Gray, sin armar la lista de 2^nulidad elementos
+    (se puede cortar con itertools.islice).
+    Parámetros:
+      tablero:   matriz n×n con 0/1, o un Tablero (entonces cada solución sale como Tablero)
+      como_bits: si es True, cada solución sale como bitset (int de n² bits); si no, como vector 0/1
+    Lanza (al llamarla, no al iterar):
+      ValueError si el tablero no tiene solución.
+    """
+    n, b_bits = _leer_tablero(tablero)
+    x_bits = _resolver_persecucion_bits(b_bits, n)
+    soluciones = _recorrido_gray(x_bits, patrones_quietos(n))
+    if como_bits:
+        return soluciones
+    if isinstance(tablero, Tablero):
+        return (Tablero(n, x) for x in soluciones)
+    return (_bits_a_vector(x, n) for x in soluciones)
+
+
+TAM_LOTE = 4096
+
+def resuelve_lote(tableros: list, tam_lote: int = TAM_LOTE, perfil: Optional[PerfilSolver] = None) -> list:
+    """
+    Resuelve muchos tableros a la vez. Los tableros se agrupan por n y cada grupo se procesa en
+    bloques de hasta tam_lote tableros rebanados por bits (un bit de cada entero por tablero),
+    así cada suma de filas del plan de eliminación se aplica a todo el bloque de una vez.
+    Devuelve una lista alineada con tableros: el x de cada uno (como resuelve_lights_out: vector,
+    o Tablero si la entrada es un Tablero), o None si ese tablero no tiene solución. Con perfil, acumula tiempos y contadores como
+    resuelve_lights_out.
+    Lanza:
+      ValueError si algún tablero no es una matriz n×n.
+    """
+    por_n: Dict[int, List[int]] = {}
+    for idx, tab in enumerate(tableros):
+        if isinstance(tab, Tablero):
+            n = tab.n
+        elif not tab or any(len(f) != len(tab) for f in tab):
+            raise ValueError("El tablero debe ser una matriz n×n de 0/1.")
+        else:
+            n = len(tab)
+        por_n.setdefault(n, []).append(idx)
+
+    resultados: list = [None] * len(tableros)
+    for n, indices in por_n.items():
+        plan = plan_eliminacion(n, perfil)
+        for ini in range(0, len(indices), tam_lote):
+            bloque = indices[ini:ini + tam_lote]
+            if perfil is not None:
+                t0 = time.perf_counter()
+            # Rebanar y desrebanar son traspuestas de la matriz tableros × celdas (ver trasponer).
+            b_filas = [tableros[idx].bits if isinstance(tableros[idx], Tablero) else _construir_b_bits(tableros[idx])
+                       for idx in bloque]
+            columnas = trasponer(b_filas, plan.tam)
+            if perfil is not None:
+                perfil.sumar_tiempo("rebanado", time.perf_counter() - t0)
+            x_cols, sin_solucion = plan.resolver_rebanadas(columnas, perfil)
+            if perfil is not None:
+                t0 = time.perf_counter()
+            x_filas = trasponer(x_cols, len(bloque))
+            for t, idx in enumerate(bloque):
+                if (sin_solucion >> t) & 1:
+                    continue
+                if isinstance(tableros[idx], Tablero):
+                    resultados[idx] = Tablero(n, x_filas[t])
+                else:
+                    resultados[idx] = _bits_a_vector(x_filas[t], n)
+            if perfil is not None:
+                perfil.sumar_tiempo("rebanado", time.perf_counter() - t0)
+                perfil.contar("tableros", len(bloque))
+    return resultados
 
-    # Leer pivotes y limpiar por arriba (también con sumas)
-    columnas_pivote = []
-    puntero = 0
-    for col in range(tam):
-        if puntero < tam and ((A[puntero] >> col) & 1) == 1:
-            columnas_pivote.append((puntero, col))
-            puntero += 1
-    for idx in range(len(columnas_pivote) - 1, -1, -1):
-        r, c = columnas_pivote[idx]
-        for rr in range(0, r):
-            if ((A[rr] >> c) & 1) == 1:
-                A[rr] ^= A[r]
-                b[rr] ^= b[r]
-
-    # Variables libres = 0 -> solución particular
-    x_bits = 0
-    for r, c in columnas_pivote:
-        if b[r] & 1:
-            x_bits |= (1 << c)
 
-    return bits_a_vector(x_bits, n)
 
+def resuelve_topologia(topologia: Topologia, estado) -> List[int]:
+    """
+    Resuelve Lights Out sobre una topología cualquiera (rectángulos, toros, plantillas propias,
+    grafos por aristas), con la misma eliminación cacheada que resuelve_lights_out.
+    Parámetros:
+      topologia: ver topologias.Topologia
+      estado:    vector 0/1 de largo topologia.tam, o matriz m×n si la topología es una grilla
+    Devuelve:
+      x: vector 0/1 de largo topologia.tam; x[k]=1 indica presionar la celda k
+    Lanza:
+      ValueError si el estado no encaja con la topología o no tiene solución.
+    """
+    if estado and isinstance(estado[0], (list, tuple)):
+        if topologia.forma is None or [len(f) for f in estado] != [topologia.forma[1]] * topologia.forma[0]:
+            raise ValueError("El estado no tiene la forma de la grilla de la topología.")
+        estado = [v for fila in estado for v in fila]
+    if len(estado) != topologia.tam:
+        raise ValueError(f"El estado debe tener {topologia.tam} celdas.")
+    b_bits = 0
+    for k, v in enumerate(estado):
+        if v & 1:
+            b_bits |= 1 << k
+    x_bits = plan_topologia(topologia).resolver_bits(b_bits)
+    return [(x_bits >> k) & 1 for k in range(topologia.tam)]
 
 def _print_matriz_int(matriz: List[List[int]], titulo: str = "", ancho: int = 1):
     if titulo:
@@ -144,13 +758,11 @@ def _coords_desde_vector(x: List[int], n: int):
     return [(k // n + 1, k % n + 1) for k, bit in enumerate(x) if bit == 1]
 
 def _aplicar_presion(tab: List[List[int]], i: int, j: int):
-    n = len(tab)
-    for di, dj in ((0,0), (1,0), (-1,0), (0,1), (0,-1)):
-        r, c = i + di, j + dj
-        if 0 <= r < n and 0 <= c < n:
-            tab[r][c] ^= 1
+    grilla_cuadrada(len(tab)).presionar_matriz(tab, i, j)
 
-def _simular_aplicacion(tablero: List[List[int]], x: List[int]) -> List[List[int]]:
+def _simular_aplicacion(tablero, x):
+    if isinstance(tablero, Tablero):
+        return tablero.aplicar(x)
     n = len(tablero)
     final = [fila[:] for fila in tablero]
     for k, bit in enumerate(x):
@@ -183,7 +795,110 @@ def _leer_tablero_desde_stdin():
         tablero.append(fila)
     return tablero
 
+# ---------- modo por lotes: un tablero por línea ----------
+def _leer_linea(linea: str, formato: str):
+    """
+    Devuelve (id, Tablero) de una línea de entrada.
+      jsonl: una matriz n×n, o un objeto {"tablero": matriz, "id": opcional}
+      hex:   "n:HEX" con el bit k del número = celda k (orden por filas)
+    """
+    if formato == "hex":
+        n_txt, hex_txt = linea.split(":", 1)
+        return None, Tablero(int(n_txt), int(hex_txt, 16))
+    dato = json.loads(linea)
+    if isinstance(dato, dict):
+        return dato.get("id"), Tablero.desde_lista(dato["tablero"])
+    return None, Tablero.desde_lista(dato)
+
+def _escribir_resultado(salida, formato: str, id_, n: Optional[int], x: Optional[Tablero], error: Optional[str] = None):
+    if formato == "hex":
+        if error is not None:
+            salida.write(f"error:{error}\n")
+        else:
+            salida.write(f"{n}:{x.bits:x}\n" if x is not None else f"{n}:-\n")
+        return
+    dato = {} if id_ is None else {"id": id_}
+    if error is not None:
+        dato["error"] = error
+    elif x is None:
+        dato["sin_solucion"] = True
+    else:
+        dato["x"] = x.a_vector()
+    salida.write(json.dumps(dato) + "\n")
+
+def resolver_flujo(entrada, salida, formato: str = "jsonl", bloque: int = 1024, metodo: str = "gauss",
+                   perfil: Optional[PerfilSolver] = None) -> int:
+    """
+    Resuelve un tablero por línea de entrada y escribe un resultado por línea (mismo orden),
+    de a bloques de hasta `bloque` líneas: memoria acotada por el bloque, salida volcada al
+    terminar cada uno. Los tableros del mismo n reutilizan el plan cacheado (metodo="gauss",
+    resueltos con resuelve_lote) o la preparación de la persecución (metodo="chase").
+    Líneas en blanco se ignoran; las inválidas producen una línea de error.
+    Devuelve la cantidad de tableros procesados.
+    Lanza:
+      ValueError si metodo no es "gauss" ni "chase" (antes de leer la entrada).
+    """
+    _validar_metodo(metodo)
+
+    def procesar(lineas: List[str]) -> None:
+        leidos = []
+        for linea in lineas:
+            try:
+                leidos.append(_leer_linea(linea, formato) + (None,))
+            except (ValueError, KeyError, TypeError) as e:
+                leidos.append((None, None, str(e) or type(e).__name__))
+        validos = [tab for _, tab, err in leidos if err is None]
+        if metodo == "gauss":
+            soluciones = iter(resuelve_lote(validos, perfil=perfil))
+        else:
+            def una(tab):
+                try:
+                    return resuelve_lights_out(tab, metodo=metodo, perfil=perfil)
+                except ValueError:
+                    return None
+            soluciones = map(una, validos)
+        for id_, tab, err in leidos:
+            if err is not None:
+                _escribir_resultado(salida, formato, id_, None, None, err)
+            else:
+                _escribir_resultado(salida, formato, id_, tab.n, next(soluciones))
+        salida.flush()
+
+    total = 0
+    pendientes: List[str] = []
+    for linea in entrada:
+        linea = linea.strip()
+        if not linea:
+            continue
+        pendientes.append(linea)
+        if len(pendientes) >= bloque:
+            procesar(pendientes)
+            total += len(pendientes)
+            pendientes = []
+    if pendientes:
+        procesar(pendientes)
+        total += len(pendientes)
+    return total
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resuelve tableros de Lights Out leídos por stdin.")
+    parser.add_argument("--profile", action="store_true", help="mostrar tiempos por fase y contadores del solver")
+    parser.add_argument("--lote", nargs="?", const="-", metavar="ARCHIVO",
+                        help="modo no interactivo: un tablero por línea desde ARCHIVO (o stdin si se omite)")
+    parser.add_argument("--formato", choices=("jsonl", "hex"), default="jsonl", help="formato de líneas en --lote")
+    parser.add_argument("--bloque", type=int, default=1024, help="tableros por bloque en --lote")
+    parser.add_argument("--metodo", choices=("gauss", "chase"), default="gauss")
+    args = parser.parse_args()
+    perfil = PerfilSolver() if args.profile else None
+
+    if args.lote is not None:
+        entrada = sys.stdin if args.lote == "-" else open(args.lote, encoding="utf-8")
+        with entrada:
+            resolver_flujo(entrada, sys.stdout, args.formato, args.bloque, args.metodo, perfil)
+        if perfil is not None:
+            print(perfil.resumen(), file=sys.stderr)
+        sys.exit(0)
+
     try:
         print("=== Lights Out en 𝔽₂ — Resolución por Gauss (solo sumas de filas) ===")
         print("Ingrese n y luego las n filas (0/1 separados por espacio).")
@@ -195,7 +910,7 @@ if __name__ == "__main__":
         _print_matriz_indices(n)
         print("\nNota: el vector x tiene longitud n² y está indexado por este mapa (1-based).")
 
-        x = resuelve_lights_out(tablero)
+        x = resuelve_lights_out(tablero, metodo=args.metodo, perfil=perfil)
         coords = _coords_desde_vector(x, n)
         presiones = _vector_a_matriz(x, n)
         movimientos = sum(x)
@@ -208,6 +923,9 @@ if __name__ == "__main__":
         else:
             print("No hay que presionar ninguna casilla (el tablero ya estaba resuelto).")
         print(f"Número de movimientos: {movimientos}")
+        x_min, exacto = _minimizar_presiones(_construir_b_bits(presiones), n)
+        etiqueta = "mínimo" if exacto else "mejor hallado"
+        print(f"Número de movimientos ({etiqueta} entre las {2 ** len(patrones_quietos(n))} soluciones): {x_min.bit_count()}")
 
         final = _simular_aplicacion(tablero, x)
         _print_matriz_int(final, titulo="Tablero final tras aplicar la solución:", ancho=1)
@@ -215,6 +933,9 @@ if __name__ == "__main__":
             print("Verificación: ✔ El tablero final quedó todo en 0.")
         else:
             print("Verificación: ✖ El tablero final no quedó todo en 0 (revise la entrada).")
+        if perfil is not None:
+            print("\nPerfil del solver:")
+            print(perfil.resumen())
 
     except ValueError as e:
         print("\nSin solución o entrada inválida:", e)
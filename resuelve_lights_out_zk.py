@@ -0,0 +1,272 @@
+# resuelve_lights_out_zk.py
+# Lights Out sobre ℤ_k: cada presión avanza un estado (mod k) la celda y sus vecinas.
+import sys
+from array import array
+from functools import lru_cache
+from math import gcd
+from typing import List, Optional, Tuple
+
+from topologias import Topologia, grilla_cuadrada
+
+# ---------- enteros empaquetados: un "carril" de w bits por tablero ----------
+_CODIGOS = {16: "H", 32: "I", 64: "Q"}
+
+def _empaquetar(valores: List[int], w: int) -> int:
+    return int.from_bytes(array(_CODIGOS[w], valores).tobytes(), sys.byteorder)
+
+def _desempaquetar(x: int, cantidad: int, w: int) -> array:
+    carriles = array(_CODIGOS[w])
+    carriles.frombytes(x.to_bytes(cantidad * w // 8, sys.byteorder))
+    return carriles
+
+def _egcd(a: int, b: int) -> Tuple[int, int, int]:
+    """(h, s, t) con h = gcd(a, b) = s·a + t·b."""
+    s0, s1, t0, t1 = 1, 0, 0, 1
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        s0, s1 = s1, s0 - q * s1
+        t0, t1 = t1, t0 - q * t1
+    return a, s0, t0
+
+def _unidad_hacia_divisor(p: int, k: int) -> int:
+    """Unidad u de ℤ_k con u·p ≡ gcd(p, k) (mod k). Todo p es asociado a gcd(p, k)."""
+    g = gcd(p, k)
+    kk = k // g
+    u = pow(p // g, -1, kk) if kk > 1 else 1
+    while gcd(u, k) != 1:
+        u += kk
+    return u
+
+
+class PlanZk:
+    """
+    Diagonalización D = U·A·V sobre ℤ_k con U, V invertibles (operaciones de filas y columnas
+    unimodulares: intercambios, sumas de múltiplos, escalas por unidades y pasos de Bézout).
+    Vale para k primo, potencia de primo o compuesto. Cada d_i no nulo queda normalizado a un
+    divisor de k, así d_i·y ≡ c tiene solución sii d_i | c.
+    Atributos:
+      k, tam:  módulo y cantidad de celdas
+      U, V:    matrices tam×tam (listas de filas) con valores en 0..k-1
+      diag:    d_0, ..., d_{r-1} no nulos (el resto de la diagonal es 0)
+    """
+    __slots__ = ("k", "tam", "U", "V", "diag")
+
+    def __init__(self, A: List[List[int]], k: int):
+        if k < 2:
+            raise ValueError("k debe ser al menos 2.")
+        self.k = k
+        self.tam = N = len(A)
+        M = [[v % k for v in fila] for fila in A]
+        U = [[int(i == j) for j in range(N)] for i in range(N)]
+        V = [[int(i == j) for j in range(N)] for i in range(N)]
+
+        def sumar_filas(X, dst, src, q):      # X[dst] <- X[dst] + q·X[src]
+            X[dst] = [(a + q * b) % k for a, b in zip(X[dst], X[src])]
+
+        def sumar_columnas(X, dst, src, q):   # col dst <- col dst + q·col src
+            for fila in X:
+                fila[dst] = (fila[dst] + q * fila[src]) % k
+
+        def bezout_filas(X, t, i, s, w, a, g, h):
+            ft, fi = X[t], X[i]
+            X[t] = [(s * x + w * y) % k for x, y in zip(ft, fi)]
+            X[i] = [((-a // h) * x + (g // h) * y) % k for x, y in zip(ft, fi)]
+
+        def bezout_columnas(X, t, j, s, w, a, g, h):
+            for fila in X:
+                x, y = fila[t], fila[j]
+                fila[t] = (s * x + w * y) % k
+                fila[j] = ((-a // h) * x + (g // h) * y) % k
+
+        diag = []
+        t = 0
+        while t < N:
+            # Pivote: la entrada que genera el ideal más grande (menor gcd con k)
+            mejor = None
+            for i in range(t, N):
+                fila = M[i]
+                for j in range(t, N):
+                    if fila[j]:
+                        g = gcd(fila[j], k)
+                        if mejor is None or g < mejor[0]:
+                            mejor = (g, i, j)
+                            if g == 1:
+                                break
+                if mejor is not None and mejor[0] == 1:
+                    break
+            if mejor is None:
+                break
+            _, i, j = mejor
+            M[t], M[i] = M[i], M[t]
+            U[t], U[i] = U[i], U[t]
+            for X in (M, V):
+                for fila in X:
+                    fila[t], fila[j] = fila[j], fila[t]
+
+            limpio = False
+            while not limpio:
+                u = _unidad_hacia_divisor(M[t][t], k)
+                M[t] = [(u * v) % k for v in M[t]]
+                U[t] = [(u * v) % k for v in U[t]]
+                g = M[t][t]
+                limpio = True
+                for i in range(t + 1, N):
+                    a = M[i][t]
+                    if a == 0:
+                        continue
+                    if a % g == 0:
+                        sumar_filas(M, i, t, -(a // g))
+                        sumar_filas(U, i, t, -(a // g))
+                    else:
+                        # g no divide a: Bézout deja en (t,t) a gcd(g, a), estrictamente menor
+                        h, s, w = _egcd(g, a)
+                        bezout_filas(M, t, i, s, w, a, g, h)
+                        bezout_filas(U, t, i, s, w, a, g, h)
+                        limpio = False
+                        break
+                if not limpio:
+                    continue
+                for j in range(t + 1, N):
+                    a = M[t][j]
+                    if a == 0:
+                        continue
+                    if a % g == 0:
+                        sumar_columnas(M, j, t, -(a // g))
+                        sumar_columnas(V, j, t, -(a // g))
+                    else:
+                        h, s, w = _egcd(g, a)
+                        bezout_columnas(M, t, j, s, w, a, g, h)
+                        bezout_columnas(V, t, j, s, w, a, g, h)
+                        limpio = False
+                        break
+            diag.append(M[t][t])
+            t += 1
+
+        self.U, self.V, self.diag = U, V, diag
+
+    @property
+    def rango(self) -> int:
+        return len(self.diag)
+
+    @property
+    def nulidad(self) -> int:
+        return self.tam - len(self.diag)
+
+    def proporcion_resoluble(self) -> float:
+        """|Im A| / k^tam: fracción exacta de tableros con solución."""
+        prop = float(self.k) ** (-self.nulidad)
+        for d in self.diag:
+            prop /= d
+        return prop
+
+    def resolver_lote(self, bs: List[List[int]]) -> List[Optional[List[int]]]:
+        """
+        Resuelve A·x ≡ -b (mod k) para cada b (vector de tam valores) de una vez: los b se
+        empaquetan en carriles de w bits, de modo que cada producto U·b y V·y es una suma de
+        enteros anchos por escalares chicos, y sólo se desempaqueta para reducir mod k.
+        Devuelve el x de cada b, o None si no tiene solución.
+        """
+        k, N, T = self.k, self.tam, len(bs)
+        if T == 0:
+            return []
+        cota = N * (k - 1) ** 2
+        w = next(w for w in (16, 32, 64) if cota < (1 << w))
+        columnas = [_empaquetar([(-b[j]) % k for b in bs], w) for j in range(N)]
+        valido = [True] * T
+        ys = []
+        for i, fila in enumerate(self.U):
+            acc = 0
+            for uij, col in zip(fila, columnas):
+                if uij:
+                    acc += uij * col
+            c = _desempaquetar(acc, T, w)
+            if i < len(self.diag):
+                d = self.diag[i]
+                y = [0] * T
+                for t, v in enumerate(c):
+                    v %= k
+                    if v % d:
+                        valido[t] = False
+                    else:
+                        y[t] = v // d
+                ys.append(_empaquetar(y, w))
+            else:
+                for t, v in enumerate(c):
+                    if v % k:
+                        valido[t] = False
+        r = len(ys)
+        x_cols = []
+        for fila in self.V:
+            acc = 0
+            for vij, y in zip(fila[:r], ys):
+                if vij:
+                    acc += vij * y
+            x_cols.append(_desempaquetar(acc, T, w))
+        return [[x_cols[j][t] % k for j in range(N)] if valido[t] else None for t in range(T)]
+
+
+def _matriz_zk(topologia: Topologia) -> List[List[int]]:
+    A = [[0] * topologia.tam for _ in range(topologia.tam)]
+    for j, vs in enumerate(topologia.vecinos):
+        for i in vs:
+            A[i][j] += 1
+    return A
+
+@lru_cache(maxsize=16)
+def _plan_zk_por_clave(clave, k: int, topologia: Topologia) -> PlanZk:
+    return PlanZk(_matriz_zk(topologia), k)
+
+def plan_zk(topologia: Topologia, k: int) -> PlanZk:
+    """Plan de ℤ_k para una topología (cacheado por clave de topología y k)."""
+    return _plan_zk_por_clave(topologia.clave, k, topologia)
+
+
+def resuelve_lote_zk(tableros: List[List[List[int]]], k: int) -> List[Optional[List[int]]]:
+    """
+    Versión por lotes de resuelve_lights_out_zk (tableros n×n, pueden mezclarse tamaños).
+    Devuelve el vector x de cada tablero, o None si no tiene solución.
+    """
+    por_n = {}
+    for idx, tab in enumerate(tableros):
+        if not tab or any(len(f) != len(tab) for f in tab):
+            raise ValueError("El tablero debe ser una matriz n×n con valores en 0..k-1.")
+        por_n.setdefault(len(tab), []).append(idx)
+    resultados: List[Optional[List[int]]] = [None] * len(tableros)
+    for n, indices in por_n.items():
+        bs = [[v for fila in tableros[idx] for v in fila] for idx in indices]
+        for idx, x in zip(indices, plan_zk(grilla_cuadrada(n), k).resolver_lote(bs)):
+            resultados[idx] = x
+    return resultados
+
+def resuelve_lights_out_zk(tablero: List[List[int]], k: int) -> List[int]:
+    """
+    Resuelve Lights Out sobre ℤ_k: cada presión suma 1 (mod k) a la celda y sus vecinas en cruz.
+    Parámetros:
+      tablero: matriz n×n con valores en 0..k-1 (0 = apagada)
+      k:       cantidad de estados por luz (k = 2 es el juego clásico)
+    Devuelve:
+      x: vector de largo n^2 con valores en 0..k-1; x[k'] = veces que hay que presionar la celda k'
+    Lanza:
+      ValueError si el tablero no tiene solución.
+    """
+    x = resuelve_lote_zk([tablero], k)[0]
+    if x is None:
+        raise ValueError(f"Sin solución: -b no pertenece al espacio columna de A sobre ℤ_{k}.")
+    return x
+
+def aplicar_zk(tab: List[List[int]], plan: List[int], k: int) -> List[List[int]]:
+    """Aplica plan (presiones por celda) al tablero sobre ℤ_k y devuelve el final."""
+    n = len(tab)
+    topo = grilla_cuadrada(n)
+    out = [fila[:] for fila in tab]
+    for idx, veces in enumerate(plan):
+        if veces % k:
+            for v in topo.vecinos[idx]:
+                r, c = divmod(v, n)
+                out[r][c] = (out[r][c] + veces) % k
+    return out
+
+def rango_y_nulidad_zk(n: int, k: int) -> Tuple[int, int]:
+    plan = plan_zk(grilla_cuadrada(n), k)
+    return plan.rango, plan.nulidad
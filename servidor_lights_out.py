@@ -0,0 +1,386 @@
+# servidor_lights_out.py
+# Servidor local (HTTP en localhost) que mantiene calientes los planes de eliminación por n
+# y junta en un solo lote (resuelve_lote) los pedidos concurrentes del mismo n.
+# Con metodo "gauss", los tableros con n > --n-max se rechazan con 400 (armar el plan de un n
+# grande bloquearía el despachador para todos los clientes); "chase" no arma plan y sólo tiene
+# el tope --n-max-chase, contra tamaños absurdos.
+# Uso:
+#   python servidor_lights_out.py --puerto 8765 --precalentar 5 10 20
+#   curl -d '{"tablero": [[1,1,0],[1,0,0],[0,0,0]]}' http://127.0.0.1:8765/resolver
+#   curl http://127.0.0.1:8765/metricas
+# Rutas:
+#   POST /resolver  {"tablero": matriz} o {"n": n, "hex": "..."}, y opcionales "metodo", "optimo"
+#   POST /lote      {"tableros": [matriz o {"n", "hex"}, ...]}, y opcionales "metodo", "optimo"
+#   GET  /metricas  pedidos, tableros, lotes, latencias (p50/p95/p99) y tableros por segundo
+#   GET  /salud
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from resuelve_lights_out import TAM_LOTE, _minimizar_presiones, plan_eliminacion, resuelve_lights_out, resuelve_lote
+from tablero import Tablero
+
+HOST = "127.0.0.1"
+PUERTO = 8765
+URL = f"http://{HOST}:{PUERTO}"
+VENTANA_S = 0.002
+N_MAX = 64          # el plan de n=64 tarda ~1,5 s; por encima, usar resuelve_lights_out(metodo="chase") local
+N_MAX_CHASE = 2000  # "chase" prepara n=500 en ~0,1 s; el tope sólo evita tamaños absurdos
+TRABAJADORES = 4    # hilos para "chase" y la minimización de "optimo"
+
+# ---------- métricas ----------
+def _percentil(xs: List[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    ordenados = sorted(xs)
+    return ordenados[min(len(ordenados) - 1, max(0, int(round(p * (len(ordenados) - 1)))))]
+
+class Metricas:
+    """Contadores del servidor; las latencias son las de los últimos 10000 pedidos."""
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.pedidos = 0
+        self.errores = 0
+        self.tableros = 0
+        self.lotes = 0            # llamadas a resuelve_lote del despachador
+        self.grupos_por_n = 0     # grupos de un mismo n dentro de esos lotes (una eliminación cada uno)
+        self._latencias: deque = deque(maxlen=10000)
+        self._cerrojo = threading.Lock()
+
+    def registrar_pedido(self, tableros: int, latencia_s: float):
+        with self._cerrojo:
+            self.pedidos += 1
+            self.tableros += tableros
+            self._latencias.append(latencia_s)
+
+    def registrar_error(self):
+        with self._cerrojo:
+            self.errores += 1
+
+    def registrar_lote(self, grupos: int):
+        with self._cerrojo:
+            self.lotes += 1
+            self.grupos_por_n += grupos
+
+    def resumen(self) -> dict:
+        with self._cerrojo:
+            latencias = list(self._latencias)
+            transcurrido = time.monotonic() - self.inicio
+            return {
+                "activo_s": transcurrido,
+                "pedidos": self.pedidos,
+                "errores": self.errores,
+                "tableros": self.tableros,
+                "lotes": self.lotes,
+                "tableros_por_grupo": self.tableros / self.grupos_por_n if self.grupos_por_n else 0.0,
+                "tableros_por_s": self.tableros / transcurrido if transcurrido > 0 else 0.0,
+                "latencia_ms": {
+                    "p50": _percentil(latencias, 0.50) * 1e3,
+                    "p95": _percentil(latencias, 0.95) * 1e3,
+                    "p99": _percentil(latencias, 0.99) * 1e3,
+                },
+            }
+
+
+# ---------- coalescencia de pedidos ----------
+def _entregar(futuro: Future, resultado=None, error: Optional[BaseException] = None):
+    """Completa el futuro salvo que ya lo esté (p. ej. si el despachador falló a mitad de lote)."""
+    try:
+        if error is not None:
+            futuro.set_exception(error)
+        else:
+            futuro.set_result(resultado)
+    except InvalidStateError:
+        pass
+
+def _optimizar(x: Tablero) -> Tablero:
+    return Tablero(x.n, _minimizar_presiones(x.bits, x.n)[0])
+
+class Coalescedor:
+    """
+    Junta los pedidos de todos los hilos del servidor: un único hilo despachador espera hasta
+    ventana_s desde que llega el primer pedido pendiente (o hasta juntar max_lote tableros),
+    y resuelve todo lo acumulado con un solo resuelve_lote, que agrupa por n. Así las cachés de
+    planes sólo se tocan desde ese hilo. La persecución ("chase") y la minimización de "optimo"
+    sólo usan tablas con lru_cache, así que van a un pool de hilos y no frenan al despachador.
+    Cada futuro termina siempre con un resultado o una excepción, aunque falle el lote entero.
+    """
+    def __init__(self, metricas: Metricas, ventana_s: float = VENTANA_S, max_lote: int = TAM_LOTE,
+                 trabajadores: int = TRABAJADORES):
+        self.metricas = metricas
+        self.ventana_s = ventana_s
+        self.max_lote = max_lote
+        self._pendientes: list = []   # (tablero, metodo, optimo, futuro)
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix="lights-out")
+        threading.Thread(target=self._despachar, daemon=True).start()
+
+    def resolver(self, tableros: List[Tablero], metodo: str = "gauss", optimo: bool = False) -> List[Future]:
+        futuros = [Future() for _ in tableros]
+        with self._cond:
+            self._pendientes.extend((tab, metodo, optimo, f) for tab, f in zip(tableros, futuros))
+            self._cond.notify()
+        return futuros
+
+    def _despachar(self):
+        while True:
+            with self._cond:
+                while not self._pendientes:
+                    self._cond.wait()
+                limite = time.monotonic() + self.ventana_s
+                while len(self._pendientes) < self.max_lote:
+                    resto = limite - time.monotonic()
+                    if resto <= 0:
+                        break
+                    self._cond.wait(resto)
+                tomados, self._pendientes = self._pendientes, []
+            try:
+                self._procesar(tomados)
+            except BaseException as e:  # el hilo sigue vivo y nadie queda esperando para siempre
+                error = e if isinstance(e, Exception) else RuntimeError(f"despachador interrumpido: {e!r}")
+                for *_, futuro in tomados:
+                    _entregar(futuro, error=error)
+
+    def _procesar(self, tomados: list):
+        gauss = [p for p in tomados if p[1] == "gauss"]
+        if gauss:
+            try:
+                soluciones = resuelve_lote([tab for tab, _, _, _ in gauss])
+            except Exception as e:
+                for _, _, _, futuro in gauss:
+                    _entregar(futuro, error=e)
+            else:
+                self.metricas.registrar_lote(len({tab.n for tab, _, _, _ in gauss}))
+                for (tab, _, optimo, futuro), x in zip(gauss, soluciones):
+                    if x is not None and optimo:
+                        self._en_pool(futuro, _optimizar, x)
+                    else:
+                        _entregar(futuro, x)
+        for tab, metodo, optimo, futuro in tomados:
+            if metodo != "gauss":
+                self._en_pool(futuro, resuelve_lights_out, tab, metodo, optimo)
+
+    def _en_pool(self, futuro: Future, funcion, *args):
+        """Corre funcion(*args) en el pool y entrega su resultado (None si lanza ValueError: sin solución)."""
+        def correr():
+            try:
+                _entregar(futuro, funcion(*args))
+            except ValueError:
+                _entregar(futuro, None)
+            except BaseException as e:
+                _entregar(futuro, error=e)
+        try:
+            self._pool.submit(correr)
+        except RuntimeError as e:  # pool cerrado
+            _entregar(futuro, error=e)
+
+    def cerrar(self):
+        self._pool.shutdown(wait=False)
+
+
+# ---------- HTTP ----------
+def _tablero_desde_json(dato, n_max: int = N_MAX) -> Tablero:
+    """
+    Una matriz n×n de 0/1, {"tablero": matriz} o {"n": n, "hex": "..."} (bit k = celda k).
+    El tamaño se controla contra n_max antes de armar nada (ValueError si lo supera).
+    """
+    if isinstance(dato, dict):
+        if "hex" in dato:
+            n = _controlar_n(int(dato["n"]), n_max)
+            return Tablero(n, int(dato["hex"], 16))
+        dato = dato["tablero"]
+    if not isinstance(dato, list):
+        raise ValueError("El tablero debe ser una matriz n×n de 0/1.")
+    _controlar_n(len(dato), n_max)
+    return Tablero.desde_lista(dato)
+
+def _controlar_n(n: int, n_max: int) -> int:
+    if n > n_max:
+        raise ValueError(f"n={n} supera el máximo de este servidor ({n_max}).")
+    return n
+
+def _resultado_json(dato, x: Optional[Tablero]) -> dict:
+    """La solución en el mismo formato en que llegó el tablero."""
+    if x is None:
+        return {"sin_solucion": True}
+    if isinstance(dato, dict) and "hex" in dato:
+        return {"n": x.n, "hex": f"{x.bits:x}"}
+    return {"x": x.a_vector()}
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _responder(self, codigo: int, cuerpo: dict):
+        datos = json.dumps(cuerpo).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        if self.path == "/metricas":
+            self._responder(200, self.server.metricas.resumen())
+        elif self.path == "/salud":
+            self._responder(200, {"ok": True})
+        else:
+            self._responder(404, {"error": f"ruta desconocida: {self.path}"})
+
+    def do_POST(self):
+        t0 = time.perf_counter()
+        if self.path not in ("/resolver", "/lote"):
+            self._responder(404, {"error": f"ruta desconocida: {self.path}"})
+            return
+        try:
+            largo = int(self.headers.get("Content-Length", 0))
+            pedido = json.loads(self.rfile.read(largo))
+            if not isinstance(pedido, dict):
+                raise ValueError("El cuerpo debe ser un objeto JSON.")
+            datos = pedido["tableros"] if self.path == "/lote" else [pedido]
+            metodo = pedido.get("metodo", "gauss")
+            if metodo not in ("gauss", "chase"):
+                raise ValueError(f"Método desconocido: {metodo!r} (use 'gauss' o 'chase').")
+            optimo = pedido.get("optimo", False)
+            if not isinstance(optimo, bool):
+                raise ValueError(f"optimo debe ser true o false (JSON), no {optimo!r}.")
+            n_max = self.server.n_max if metodo == "gauss" else self.server.n_max_chase
+            tableros = [_tablero_desde_json(d, n_max) for d in datos]
+        except (ValueError, KeyError, TypeError) as e:
+            self.server.metricas.registrar_error()
+            self._responder(400, {"error": str(e) or type(e).__name__})
+            return
+
+        futuros = self.server.coalescedor.resolver(tableros, metodo, optimo)
+        try:
+            resultados = [_resultado_json(d, f.result()) for d, f in zip(datos, futuros)]
+        except Exception as e:
+            self.server.metricas.registrar_error()
+            self._responder(500, {"error": str(e) or type(e).__name__})
+            return
+        self._responder(200, {"resultados": resultados} if self.path == "/lote" else resultados[0])
+        self.server.metricas.registrar_pedido(len(tableros), time.perf_counter() - t0)
+
+    def log_message(self, formato, *args):
+        if self.server.verboso:
+            super().log_message(formato, *args)
+
+class ServidorLightsOut(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # muchos clientes conectando a la vez (el valor por defecto es 5)
+
+    def __init__(self, host: str = HOST, puerto: int = PUERTO, ventana_s: float = VENTANA_S,
+                 max_lote: int = TAM_LOTE, verboso: bool = False, n_max: int = N_MAX,
+                 trabajadores: int = TRABAJADORES, n_max_chase: int = N_MAX_CHASE):
+        super().__init__((host, puerto), _Manejador)
+        self.metricas = Metricas()
+        self.coalescedor = Coalescedor(self.metricas, ventana_s, max_lote, trabajadores)
+        self.verboso = verboso
+        self.n_max = n_max
+        self.n_max_chase = n_max_chase
+
+    def server_close(self):
+        super().server_close()
+        self.coalescedor.cerrar()
+
+    @property
+    def url(self) -> str:
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+
+# ---------- cliente ----------
+def _post(url: str, ruta: str, cuerpo: dict, timeout: float) -> dict:
+    pedido = urllib.request.Request(url + ruta, data=json.dumps(cuerpo).encode("utf-8"),
+                                    headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(pedido, timeout=timeout) as r:
+            return json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        try:
+            mensaje = json.loads(e.read()).get("error", str(e))
+        except ValueError:
+            mensaje = str(e)
+        if e.code == 400:
+            raise ValueError(mensaje) from None
+        raise RuntimeError(f"Error del servidor ({e.code}): {mensaje}") from None
+
+def _tablero_a_json(tablero) -> dict:
+    if isinstance(tablero, Tablero):
+        return {"n": tablero.n, "hex": f"{tablero.bits:x}"}
+    return {"tablero": tablero}
+
+def _solucion_desde_json(tablero, resultado: dict):
+    if resultado.get("sin_solucion"):
+        return None
+    if isinstance(tablero, Tablero):
+        return Tablero(int(resultado["n"]), int(resultado["hex"], 16))
+    return resultado["x"]
+
+def resuelve_lights_out_remoto(tablero, metodo: str = "gauss", optimo: bool = False,
+                               url: str = URL, timeout: float = 60.0):
+    """
+    Igual que resuelve_lights_out, pero resuelto por un servidor_lights_out en url.
+    Lanza ValueError si el tablero es inválido o no tiene solución; OSError (URLError) si no
+    hay servidor.
+    """
+    cuerpo = _tablero_a_json(tablero)
+    cuerpo.update(metodo=metodo, optimo=optimo)
+    x = _solucion_desde_json(tablero, _post(url, "/resolver", cuerpo, timeout))
+    if x is None:
+        raise ValueError("Sin solución: b no pertenece al espacio columna de A (b ∉ Col(A)).")
+    return x
+
+def resuelve_lote_remoto(tableros: list, url: str = URL, timeout: float = 60.0) -> list:
+    """Igual que resuelve_lote (None para los tableros sin solución), resuelto por el servidor."""
+    cuerpo = {"tableros": [_tablero_a_json(t) for t in tableros]}
+    resultados = _post(url, "/lote", cuerpo, timeout)["resultados"]
+    return [_solucion_desde_json(t, r) for t, r in zip(tableros, resultados)]
+
+def metricas_remotas(url: str = URL, timeout: float = 10.0) -> dict:
+    with urllib.request.urlopen(url + "/metricas", timeout=timeout) as r:
+        return json.loads(r.read())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor local del solver de Lights Out.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--ventana-ms", type=float, default=VENTANA_S * 1e3,
+                        help="espera máxima para juntar pedidos concurrentes en un lote")
+    parser.add_argument("--max-lote", type=int, default=TAM_LOTE, help="tableros por lote como máximo")
+    parser.add_argument("--n-max", type=int, default=N_MAX,
+                        help="tamaño máximo con metodo 'gauss'; los tableros más grandes se rechazan con 400")
+    parser.add_argument("--n-max-chase", type=int, default=N_MAX_CHASE,
+                        help="tamaño máximo con metodo 'chase' (no arma plan ni ocupa el despachador)")
+    parser.add_argument("--trabajadores", type=int, default=TRABAJADORES,
+                        help="hilos para los pedidos 'chase' y la minimización de 'optimo'")
+    parser.add_argument("--precalentar", type=int, nargs="*", default=[], metavar="N",
+                        help="tamaños cuyos planes se preparan antes de aceptar pedidos")
+    parser.add_argument("--verboso", action="store_true", help="registrar cada pedido en stderr")
+    args = parser.parse_args(argv)
+
+    for n in args.precalentar:
+        if n > args.n_max:
+            parser.error(f"--precalentar {n} supera --n-max {args.n_max}")
+        plan_eliminacion(n)
+    servidor = ServidorLightsOut(args.host, args.puerto, args.ventana_ms / 1e3, args.max_lote, args.verboso,
+                                 args.n_max, args.trabajadores, args.n_max_chase)
+    print(f"Escuchando en {servidor.url}", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
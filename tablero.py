@@ -0,0 +1,117 @@
+# tablero.py
+# Tablero n×n de Lights Out como bitboard: un solo entero, bit i*n + j = celda (i,j).
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+from topologias import CRUZ
+
+@lru_cache(maxsize=256)
+def _desplazamientos(n: int, plantilla: Sequence[Tuple[int, int]] = CRUZ) -> Tuple[Tuple[int, int], ...]:
+    """
+    Por cada (di, dj) de la plantilla: (di·n + dj, máscara de las celdas (i,j) cuyo destino
+    (i+di, j+dj) cae dentro del tablero). Presionar p cambia (p & máscara) corrido di·n + dj bits.
+    """
+    resultado = []
+    for di, dj in plantilla:
+        filas = range(max(0, -di), min(n, n - di))
+        columnas = range(max(0, -dj), min(n, n - dj))
+        en_fila = sum(1 << j for j in columnas)
+        origen = sum(en_fila << (i * n) for i in filas)
+        resultado.append((di * n + dj, origen))
+    return tuple(resultado)
+
+# Las 8 simetrías del cuadrado, numeradas g = 4·t + e: primero se traspone si t = 1 y después se
+# aplica e ∈ {identidad, espejo horizontal, espejo vertical, giro de 180°}.
+INVERSA_SIMETRIA = (0, 1, 2, 3, 4, 6, 5, 7)
+
+def _variantes(s: str, n: int) -> Tuple[str, str, str, str]:
+    """Las 4 imágenes sin trasponer de un tablero escrito como cadena de n² bits (filas contiguas)."""
+    espejo = "".join(s[i:i + n][::-1] for i in range(0, n * n, n))
+    return s, espejo, espejo[::-1], s[::-1]
+
+def _cadena(bits: int, n: int) -> str:
+    # Se escribe del bit más alto al más bajo: eso es el giro de 180°, que conmuta con todas las
+    # simetrías, así que las operaciones sobre la cadena dan las mismas simetrías sobre los bits.
+    return format(bits, f"0{n * n}b")
+
+def simetrias_bits(bits: int, n: int) -> List[int]:
+    """Las 8 imágenes del bitboard por las simetrías del cuadrado, en el orden de g (cortes de cadenas en C, O(n²))."""
+    s = _cadena(bits, n)
+    t = "".join(s[j::n] for j in range(n))
+    return [int(v, 2) for v in (*_variantes(s, n), *_variantes(t, n))]
+
+def aplicar_simetria(bits: int, n: int, g: int) -> int:
+    s = _cadena(bits, n)
+    if g >= 4:
+        s = "".join(s[j::n] for j in range(n))
+    return int(_variantes(s, n)[g % 4], 2)
+
+class Tablero:
+    """
+    Bitboard inmutable de un tablero n×n (también sirve para planes de presiones).
+    Aplicar un plan entero cuesta unas pocas operaciones de desplazamiento y AND sobre un int:
+    un AND y un corrimiento por cada desplazamiento de la plantilla topologias.CRUZ.
+    """
+    __slots__ = ("n", "bits")
+
+    def __init__(self, n: int, bits: int = 0):
+        if n < 1:
+            raise ValueError("El tablero debe tener n ≥ 1.")
+        if bits < 0 or bits >> (n * n):
+            raise ValueError(f"bits fuera de rango para un tablero {n}×{n}.")
+        self.n = n
+        self.bits = bits
+
+    # ---------- conversión (sólo en los bordes de E/S) ----------
+    @classmethod
+    def desde_lista(cls, filas: List[List[int]]) -> "Tablero":
+        n = len(filas)
+        if not filas or any(len(f) != n for f in filas):
+            raise ValueError("El tablero debe ser una matriz n×n de 0/1.")
+        bits = 0
+        k = 0
+        for fila in filas:
+            for v in fila:
+                if v & 1:
+                    bits |= 1 << k
+                k += 1
+        return cls(n, bits)
+
+    def a_vector(self) -> List[int]:
+        return [(self.bits >> k) & 1 for k in range(self.n * self.n)]
+
+    def a_lista(self) -> List[List[int]]:
+        v = self.a_vector()
+        return [v[i * self.n:(i + 1) * self.n] for i in range(self.n)]
+
+    # ---------- presiones ----------
+    def cruz(self) -> int:
+        """Bits que cambian al presionar todas las celdas encendidas de este tablero (visto como plan)."""
+        p = self.bits
+        cambios = 0
+        for corrimiento, origen in _desplazamientos(self.n):
+            q = p & origen
+            cambios ^= q << corrimiento if corrimiento >= 0 else q >> -corrimiento
+        return cambios
+
+    def aplicar(self, plan: "Tablero") -> "Tablero":
+        """Estado final tras presionar cada celda encendida de plan."""
+        if plan.n != self.n:
+            raise ValueError("El plan y el tablero deben tener el mismo n.")
+        return Tablero(self.n, self.bits ^ plan.cruz())
+
+    def simetrico(self, g: int) -> "Tablero":
+        """Imagen por la simetría g (ver INVERSA_SIMETRIA); si x resuelve este tablero, x.simetrico(g) resuelve la imagen."""
+        return Tablero(self.n, aplicar_simetria(self.bits, self.n, g))
+
+    def apagado(self) -> bool:
+        return self.bits == 0
+
+    def __eq__(self, otro) -> bool:
+        return isinstance(otro, Tablero) and self.n == otro.n and self.bits == otro.bits
+
+    def __hash__(self) -> int:
+        return hash((self.n, self.bits))
+
+    def __repr__(self) -> str:
+        return f"Tablero(n={self.n}, bits={self.bits:#x})"
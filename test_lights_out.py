@@ -0,0 +1,362 @@
+# test_lights_out.py
+# Pruebas de regresión: las versiones rápidas contra referencias simples y lentas (correr con pytest).
+import io
+import itertools
+import json
+import random
+import threading
+
+import pytest
+
+from eliminacion_f2 import eliminar_por_bloques
+from experimentos_stats import nulidad_y_rango
+from resuelve_lights_out import (CacheSoluciones, PlanEliminacion, cache_soluciones, columnas_persecucion,
+                                  construir_A_bitfilas, es_resoluble, plan_eliminacion, resolver_flujo,
+                                  resuelve_lights_out, resuelve_lights_out_cacheado, resuelve_lote)
+from resuelve_lights_out_zk import aplicar_zk, plan_zk, resuelve_lights_out_zk, resuelve_lote_zk
+from servidor_lights_out import ServidorLightsOut, _post, resuelve_lights_out_remoto
+from tablero import Tablero, aplicar_simetria
+from topologias import Topologia, grilla_cuadrada
+
+
+# ---------- construcción de A ----------
+def _A_por_barrido(n: int):
+    """El armado original de A: por cada celda se recorren las n² cruces buscándola (O(n⁴))."""
+    def vecinos_cruz(i, j):
+        for di, dj in ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)):
+            r, c = i + di, j + dj
+            if 0 <= r < n and 0 <= c < n:
+                yield r, c
+
+    A_bits = [0] * (n * n)
+    for i in range(n):
+        for j in range(n):
+            bitfila = 0
+            for r in range(n):
+                for c in range(n):
+                    if (i, j) in vecinos_cruz(r, c):
+                        bitfila |= 1 << (r * n + c)
+            A_bits[i * n + j] = bitfila
+    return A_bits
+
+@pytest.mark.parametrize("n", range(1, 13))
+def test_A_igual_al_barrido_original(n):
+    assert construir_A_bitfilas(n) == _A_por_barrido(n)
+
+@pytest.mark.parametrize("m, n", [(1, 5), (3, 4), (6, 2)])
+def test_A_rectangular_simetrica_y_con_la_cruz(m, n):
+    A = Topologia.rectangular(m, n).matriz_bitfilas()
+    for k, fila in enumerate(A):
+        i, j = divmod(k, n)
+        esperada = {(i + di, j + dj) for di, dj in ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1))
+                    if 0 <= i + di < m and 0 <= j + dj < n}
+        assert {divmod(c, n) for c in range(m * n) if (fila >> c) & 1} == esperada
+        assert all(((A[c] >> k) & 1) == ((fila >> c) & 1) for c in range(m * n))
+
+def test_A_grande_contra_barrido_en_filas_sueltas():
+    n = 30
+    A = construir_A_bitfilas(n)
+    for k in random.Random(2).sample(range(n * n), 20):
+        i, j = divmod(k, n)
+        fila = 0
+        for r, c in ((i, j), (i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+            if 0 <= r < n and 0 <= c < n:
+                fila |= 1 << (r * n + c)
+        assert A[k] == fila
+
+@pytest.mark.parametrize("n", range(1, 9))
+def test_cruz_del_bitboard_igual_a_la_topologia(n):
+    vecinos = Topologia.rectangular(n, n).vecinos
+    rng = random.Random(n)
+    for _ in range(20):
+        p = rng.getrandbits(n * n)
+        esperado = 0
+        for k in range(n * n):
+            if (p >> k) & 1:
+                for v in vecinos[k]:
+                    esperado ^= 1 << v
+        assert Tablero(n, p).cruz() == esperado
+
+
+# ---------- nulidad por polinomios ----------
+@pytest.mark.parametrize("n", range(1, 21))
+def test_nulidad_por_polinomios_igual_a_gauss_denso(n):
+    assert nulidad_y_rango(n) == nulidad_y_rango(n, "denso")
+
+def test_nulidades_conocidas():
+    conocidas = {4: 4, 5: 2, 9: 8, 11: 6, 16: 8, 19: 16, 95: 62}
+    assert {n: nulidad_y_rango(n)[1] for n in conocidas} == conocidas
+
+
+# ---------- eliminación por bloques ----------
+def _rref_simple(filas, ncols):
+    """Gauss-Jordan de libro, columna por columna: (filas de la escalonada reducida, pivotes); las
+    filas de pivote van primero, en el orden de sus columnas."""
+    filas = list(filas)
+    pivotes = []
+    r = 0
+    for c in range(ncols):
+        p = next((i for i in range(r, len(filas)) if (filas[i] >> c) & 1), None)
+        if p is None:
+            continue
+        filas[r], filas[p] = filas[p], filas[r]
+        for i in range(len(filas)):
+            if i != r and (filas[i] >> c) & 1:
+                filas[i] ^= filas[r]
+        pivotes.append(c)
+        r += 1
+    return filas, pivotes
+
+def _matriz_aleatoria(rng, nfilas, ncols, densidad):
+    return [sum(1 << c for c in range(ncols) if rng.random() < densidad) for _ in range(nfilas)]
+
+@pytest.mark.parametrize("k", [1, 3, 8])
+@pytest.mark.parametrize("nfilas, ncols, densidad", [(20, 20, 0.5), (30, 17, 0.3), (12, 40, 0.5), (25, 25, 0.05)])
+def test_bloques_igual_a_gauss_simple(k, nfilas, ncols, densidad):
+    rng = random.Random(nfilas * 1000 + ncols * 10 + k)
+    for _ in range(5):
+        A = _matriz_aleatoria(rng, nfilas, ncols, densidad)
+        # [A | I]: la parte alta registra las sumas hechas (T), con T·A = R
+        filas = [A[r] | (1 << (ncols + r)) for r in range(nfilas)]
+        pivotes, _, _ = eliminar_por_bloques(filas, ncols, k)
+        mascara = (1 << ncols) - 1
+        R_ref, piv_ref = _rref_simple(A, ncols)
+        assert [c for _, c in pivotes] == piv_ref
+        assert [filas[r] & mascara for r, _ in pivotes] == R_ref[:len(piv_ref)]
+        assert all(filas[r] & mascara == 0 for r in set(range(nfilas)) - {r for r, _ in pivotes})
+        for f in filas:
+            combinada, t = 0, f >> ncols
+            for r in range(nfilas):
+                if (t >> r) & 1:
+                    combinada ^= A[r]
+            assert combinada == f & mascara
+
+def _resolver_simple(A, b, tam):
+    """x con libres = 0 por Gauss-Jordan de libro sobre [A | b], o None si no hay solución."""
+    R, pivotes = _rref_simple([A[r] | (((b >> r) & 1) << tam) for r in range(tam)], tam)
+    if any(fila == 1 << tam for fila in R[len(pivotes):]):
+        return None
+    return sum(((fila >> tam) & 1) << c for fila, c in zip(R, pivotes))
+
+@pytest.mark.parametrize("n", [1, 2, 4, 5, 7, 9, 11])
+def test_plan_igual_a_gauss_simple(n):
+    tam = n * n
+    A = construir_A_bitfilas(n)
+    plan = PlanEliminacion(A)
+    assert plan.rango == len(_rref_simple(A, tam)[1])
+    rng = random.Random(n)
+    for _ in range(40):
+        b = rng.getrandbits(tam)
+        esperado = _resolver_simple(A, b, tam)
+        if esperado is None:
+            with pytest.raises(ValueError):
+                plan.resolver_bits(b)
+        else:
+            assert plan.resolver_bits(b) == esperado
+
+
+@pytest.mark.parametrize("n", [1, 2, 4, 5, 9, 11, 16])
+def test_columnas_persecucion_dan_la_solucion_del_plan(n):
+    cols_pinv, cols_nulos = columnas_persecucion(n)
+    rng = random.Random(n)
+    for _ in range(30):
+        b = rng.getrandbits(n * n)
+        x = sindrome = 0
+        for k in range(n * n):
+            if (b >> k) & 1:
+                x ^= cols_pinv[k]
+                sindrome ^= cols_nulos[k]
+        assert (sindrome == 0) == es_resoluble(Tablero(n, b))
+        if sindrome == 0:
+            assert x == plan_eliminacion(n).resolver_bits(b)
+
+
+# ---------- persecución de luces ----------
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5, 6, 9, 11, 16, 19])
+def test_chase_igual_a_gauss(n):
+    rng = random.Random(300 + n)
+    tableros = [Tablero(n, rng.getrandbits(n * n)) for _ in range(40)]
+    # con nulidad > 0 casi ningún tablero al azar tiene solución: se agregan algunos que sí
+    tableros += [Tablero(n, Tablero(n, rng.getrandbits(n * n)).cruz()) for _ in range(10)]
+    resolubles = 0
+    for t in tableros:
+        try:
+            esperado = resuelve_lights_out(t, metodo="gauss")
+        except ValueError:
+            with pytest.raises(ValueError):
+                resuelve_lights_out(t, metodo="chase")
+        else:
+            resolubles += 1
+            assert resuelve_lights_out(t, metodo="chase") == esperado
+            assert resuelve_lights_out(t.a_lista(), metodo="chase") == esperado.a_vector()
+    assert resolubles >= 10
+
+
+# ---------- lotes rebanados por bits ----------
+def _uno_a_uno(tablero):
+    try:
+        return resuelve_lights_out(tablero)
+    except ValueError:
+        return None
+
+@pytest.mark.parametrize("tam_lote", [1, 7, 64, 4096])
+def test_lote_igual_a_uno_a_uno(tam_lote):
+    rng = random.Random(tam_lote)
+    tableros = []
+    for _ in range(150):
+        n = rng.choice((1, 3, 4, 5, 8, 10))
+        t = Tablero(n, rng.getrandbits(n * n))
+        tableros.append(t if rng.random() < 0.5 else t.a_lista())
+    assert resuelve_lote(tableros, tam_lote=tam_lote) == [_uno_a_uno(t) for t in tableros]
+
+
+@pytest.mark.parametrize("metodo", ["gauss", "chase"])
+def test_flujo_igual_a_uno_a_uno(metodo):
+    rng = random.Random(11)
+    tableros = [Tablero(n, rng.getrandbits(n * n)) for n in (3, 4, 5, 6) for _ in range(10)]
+    entrada = io.StringIO("".join(json.dumps({"id": k, "tablero": t.a_lista()}) + "\n"
+                                  for k, t in enumerate(tableros)))
+    salida = io.StringIO()
+    assert resolver_flujo(entrada, salida, bloque=7, metodo=metodo) == len(tableros)
+    for linea, t in zip(salida.getvalue().splitlines(), tableros):
+        dato = json.loads(linea)
+        x = _uno_a_uno(t)
+        assert dato.get("sin_solucion", False) == (x is None)
+        if x is not None:
+            assert dato["x"] == x.a_vector()
+
+def test_flujo_rechaza_metodo_desconocido():
+    with pytest.raises(ValueError, match="Método desconocido"):
+        resolver_flujo(io.StringIO("[[1]]\n"), io.StringIO(), metodo="Chase")
+
+
+# ---------- caché de soluciones por simetría ----------
+def _directo(n, b):
+    try:
+        return plan_eliminacion(n).resolver_bits(b)
+    except ValueError:
+        return None
+
+@pytest.mark.parametrize("n", [2, 3, 4, 5, 6, 9])
+def test_cache_por_simetria_igual_a_resolver_directo(n):
+    cache = CacheSoluciones()
+    rng = random.Random(100 + n)
+    for _ in range(15):
+        b = rng.getrandbits(n * n)
+        for g in range(8):  # la primera imagen llena la caché; el resto son aciertos vía simetría
+            bg = aplicar_simetria(b, n, g)
+            assert cache.resolver_bits(n, bg, _directo) == _directo(n, bg)
+    assert cache.aciertos > 0
+
+def test_cache_acotada_y_sin_solucion_guardada():
+    cache = CacheSoluciones(max_entradas=3)
+    n = 4
+    llamadas = []
+    def contar(n_, b_):
+        llamadas.append(b_)
+        return plan_eliminacion(n_).resolver_bits(b_)
+    b = 1  # una sola luz en la esquina: sin solución en 4×4
+    assert cache.resolver_bits(n, b, contar) is None
+    assert cache.resolver_bits(n, aplicar_simetria(b, n, 1), contar) is None
+    assert len(llamadas) == 1
+    for k in range(1, 6):
+        cache.resolver_bits(n, (1 << k) | 1, _directo)
+    assert cache.estadisticas()["entradas"] == 3
+
+@pytest.mark.parametrize("metodo", ["gauss", "chase"])
+def test_resuelve_cacheado_igual_a_resuelve(metodo):
+    cache_soluciones.limpiar()
+    rng = random.Random(7)
+    for n in (3, 5, 6, 10):
+        for _ in range(10):
+            t = Tablero(n, rng.getrandbits(n * n))
+            for tablero in (t, t.simetrico(3), t.a_lista()):
+                try:
+                    esperado = resuelve_lights_out(tablero, metodo=metodo)
+                except ValueError:
+                    with pytest.raises(ValueError):
+                        resuelve_lights_out_cacheado(tablero, metodo=metodo)
+                else:
+                    assert resuelve_lights_out_cacheado(tablero, metodo=metodo) == esperado
+    assert cache_soluciones.aciertos > 0
+    cache_soluciones.limpiar()
+
+
+# ---------- ℤ_k ----------
+def _imagen_zk(n, k):
+    """Todos los A·x (mod k) por fuerza bruta: el subgrupo generado por las columnas, una a la vez."""
+    imagen = {(0,) * (n * n)}
+    for vs in grilla_cuadrada(n).vecinos:  # columna j de A: las celdas que cambia presionar j
+        nueva = set()
+        for v in imagen:
+            w = list(v)
+            for _ in range(k):
+                nueva.add(tuple(w))
+                for i in vs:
+                    w[i] = (w[i] + 1) % k
+        imagen = nueva
+    return imagen
+
+# k primo (2, 3, 5), potencia de primo (4) y compuesto (6)
+@pytest.mark.parametrize("n, k", [(n, k) for n in (1, 2) for k in range(2, 7)] + [(3, 2), (3, 3), (3, 4)])
+def test_zk_contra_fuerza_bruta(n, k):
+    tam = n * n
+    imagen = _imagen_zk(n, k)
+    assert plan_zk(grilla_cuadrada(n), k).proporcion_resoluble() == pytest.approx(len(imagen) / k ** tam)
+    if k ** tam <= 1296:
+        bs = list(itertools.product(range(k), repeat=tam))
+    else:
+        rng = random.Random(k)
+        bs = [tuple(rng.randrange(k) for _ in range(tam)) for _ in range(300)]
+        bs += rng.sample(sorted(imagen), 100)
+    tableros = [[list(b[i * n:(i + 1) * n]) for i in range(n)] for b in bs]
+    for b, tab, x in zip(bs, tableros, resuelve_lote_zk(tableros, k)):
+        resoluble = tuple((-v) % k for v in b) in imagen
+        assert (x is not None) == resoluble
+        if resoluble:
+            assert aplicar_zk(tab, x, k) == [[0] * n for _ in range(n)]
+        else:
+            with pytest.raises(ValueError):
+                resuelve_lights_out_zk(tab, k)
+
+@pytest.mark.parametrize("n", [3, 4, 5])
+def test_zk_compuesto_por_restos_chinos(n):
+    # ℤ_6 ≅ ℤ_2 × ℤ_3 y ℤ_12 ≅ ℤ_4 × ℤ_3: las fracciones resolubles se multiplican
+    prop = {k: plan_zk(grilla_cuadrada(n), k).proporcion_resoluble() for k in (2, 3, 4, 6, 12)}
+    assert prop[6] == pytest.approx(prop[2] * prop[3])
+    assert prop[12] == pytest.approx(prop[4] * prop[3])
+
+
+# ---------- servidor local ----------
+@pytest.fixture
+def servidor():
+    srv = ServidorLightsOut(puerto=0, n_max=8, n_max_chase=30)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+def test_servidor_limita_n_solo_para_gauss(servidor):
+    t = Tablero(20, Tablero(20, 12345).cruz())
+    assert resuelve_lights_out_remoto(t, metodo="chase", url=servidor.url) == resuelve_lights_out(t)
+    with pytest.raises(ValueError, match="máximo"):
+        resuelve_lights_out_remoto(t, url=servidor.url)
+    with pytest.raises(ValueError, match="máximo"):
+        resuelve_lights_out_remoto(Tablero(31, 1), metodo="chase", url=servidor.url)
+
+def test_servidor_exige_optimo_booleano(servidor):
+    with pytest.raises(ValueError, match="optimo"):
+        _post(servidor.url, "/resolver", {"n": 3, "hex": "1", "optimo": "false"}, 10)
+    assert _post(servidor.url, "/resolver", {"n": 3, "hex": "1", "optimo": False}, 10) == {"n": 3, "hex": "e5"}
+
+
+# ---------- camino opcional con NumPy ----------
+def test_cruz_numpy_igual_a_la_del_bitboard():
+    np = pytest.importorskip("numpy")
+    import lote_numpy
+    rng = np.random.default_rng(5)
+    for n in range(1, 8):
+        planes = lote_numpy.tableros_aleatorios(30, n, rng)
+        for plan, cambios in zip(planes, lote_numpy.cruz(planes)):
+            esperado = Tablero(n, Tablero.desde_lista(plan.tolist()).cruz())
+            assert Tablero.desde_lista(cambios.tolist()) == esperado
@@ -0,0 +1,104 @@
+# topologias.py
+# Topologías de tablero para Lights Out: qué celdas cambia cada presión, como adyacencia dispersa.
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Plantilla clásica: la celda presionada y sus 4 vecinas ortogonales.
+CRUZ = ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1))
+
+class Topologia:
+    """
+    Tablero general de Lights Out visto como grafo disperso.
+    Atributos:
+      tam:     cantidad de celdas (índices 0..tam-1; en grillas m×n, orden por filas)
+      forma:   (m, n) si es una grilla, None si es un grafo arbitrario
+      vecinos: vecinos[k] = tupla de celdas que cambian al presionar k
+      clave:   identificador hashable de la topología (sirve para cachear planes)
+    Construir A o simular presiones cuesta O(aristas), no O(celdas²).
+    """
+    __slots__ = ("tam", "forma", "vecinos", "clave")
+
+    def __init__(self, vecinos: Sequence[Iterable[int]], forma: Optional[Tuple[int, int]] = None, clave=None):
+        self.tam = len(vecinos)
+        self.forma = forma
+        self.vecinos = [tuple(v) for v in vecinos]
+        for v in self.vecinos:
+            if any(not 0 <= k < self.tam for k in v):
+                raise ValueError("Los vecinos deben ser índices de celda entre 0 y tam-1.")
+        self.clave = clave if clave is not None else ("vecinos", tuple(self.vecinos))
+
+    # ---------- constructores ----------
+    @classmethod
+    def grilla(cls, m: int, n: int, plantilla: Sequence[Tuple[int, int]] = CRUZ, toroidal: bool = False) -> "Topologia":
+        """
+        Grilla m×n donde presionar (i,j) cambia (i+di, j+dj) para cada (di,dj) de la plantilla.
+        Con toroidal=True los bordes se unen; si dos desplazamientos caen en la misma celda, se anulan (𝔽₂).
+        """
+        if m < 1 or n < 1:
+            raise ValueError("La grilla debe tener al menos una fila y una columna.")
+        plantilla = tuple((int(di), int(dj)) for di, dj in plantilla)
+        vecinos = []
+        for i in range(m):
+            for j in range(n):
+                impares = set()
+                for di, dj in plantilla:
+                    r, c = i + di, j + dj
+                    if toroidal:
+                        r, c = r % m, c % n
+                    elif not (0 <= r < m and 0 <= c < n):
+                        continue
+                    impares ^= {r * n + c}
+                vecinos.append(sorted(impares))
+        return cls(vecinos, forma=(m, n), clave=("grilla", m, n, plantilla, toroidal))
+
+    @classmethod
+    def rectangular(cls, m: int, n: int) -> "Topologia":
+        return cls.grilla(m, n)
+
+    @classmethod
+    def toroidal(cls, m: int, n: int) -> "Topologia":
+        return cls.grilla(m, n, toroidal=True)
+
+    @classmethod
+    def desde_aristas(cls, num_nodos: int, aristas: Iterable[Tuple[int, int]]) -> "Topologia":
+        """Grafo no dirigido: presionar un nodo lo cambia a él y a sus vecinos."""
+        adyacentes = [{k} for k in range(num_nodos)]
+        for u, v in aristas:
+            if not (0 <= u < num_nodos and 0 <= v < num_nodos) or u == v:
+                raise ValueError(f"Arista inválida: ({u}, {v}).")
+            adyacentes[u].add(v)
+            adyacentes[v].add(u)
+        vecinos = [sorted(a) for a in adyacentes]
+        return cls(vecinos, clave=("aristas", tuple(map(tuple, vecinos))))
+
+    # ---------- matriz y simulación ----------
+    def matriz_bitfilas(self) -> List[int]:
+        """A como filas bitset: A[i] tiene el bit j si presionar j cambia la celda i."""
+        A = [0] * self.tam
+        for j, vs in enumerate(self.vecinos):
+            bit = 1 << j
+            for i in vs:
+                A[i] |= bit
+        return A
+
+    def aplicar_plan(self, estado: List[int], plan: List[int]) -> List[int]:
+        """Aplica un plan (vector 0/1 por celda) a un estado plano y devuelve el estado final."""
+        final = list(estado)
+        for k, bit in enumerate(plan):
+            if bit:
+                for v in self.vecinos[k]:
+                    final[v] ^= 1
+        return final
+
+    def presionar_matriz(self, tab: List[List[int]], i: int, j: int):
+        """Presiona (i,j) sobre un tablero de grilla guardado como lista de filas (lo modifica)."""
+        n = self.forma[1]
+        for v in self.vecinos[i * n + j]:
+            r, c = divmod(v, n)
+            tab[r][c] ^= 1
+
+
+@lru_cache(maxsize=64)
+def grilla_cuadrada(n: int) -> Topologia:
+    """Topología clásica n×n con la cruz (cacheada por n)."""
+    return Topologia.rectangular(n, n)